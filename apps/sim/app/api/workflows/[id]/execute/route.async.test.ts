@@ -169,3 +169,104 @@ describe('workflow execute async route', () => {
     )
   })
 })
+
+describe('workflow execute multipart body', () => {
+  beforeEach(() => {
+    vi.clearAllMocks()
+
+    mockCheckHybridAuth.mockResolvedValue({
+      success: true,
+      userId: 'api-user-1',
+      authType: 'api_key',
+    })
+
+    mockAuthorizeWorkflowByWorkspacePermission.mockResolvedValue({
+      allowed: true,
+      workflow: {
+        id: 'workflow-1',
+        userId: 'owner-1',
+        workspaceId: 'workspace-1',
+      },
+    })
+
+    mockPreprocessExecution.mockResolvedValue({
+      success: true,
+      actorUserId: 'actor-1',
+      workflowRecord: {
+        id: 'workflow-1',
+        userId: 'owner-1',
+        workspaceId: 'workspace-1',
+      },
+    })
+  })
+
+  /** A multipart execute request as the Python SDK sends it, queued in async mode. */
+  function createMultipartRequest(formData: FormData) {
+    return new Request('http://localhost:3000/api/workflows/workflow-1/execute', {
+      method: 'POST',
+      headers: { 'X-Execution-Mode': 'async' },
+      body: formData,
+    })
+  }
+
+  /** The name of the file part that replaces the input value at path. */
+  function filePartName(path: Array<string | number>) {
+    return encodeURIComponent(JSON.stringify(path))
+  }
+
+  it('rebuilds file parts into file objects at their input path', async () => {
+    const formData = new FormData()
+    formData.append('message', JSON.stringify('Hello'))
+    formData.append('docs', JSON.stringify([null]))
+    formData.append(
+      filePartName(['docs', 0]),
+      new File(['%PDF-1.4'], 'report.pdf', { type: 'application/pdf' })
+    )
+    const params = Promise.resolve({ id: 'workflow-1' })
+
+    const response = await POST(createMultipartRequest(formData) as any, { params })
+
+    expect(response.status).toBe(202)
+    const { bullmqPayload } = mockEnqueueWorkspaceDispatch.mock.calls[0][0]
+    expect(bullmqPayload.payload.input).toEqual({
+      message: 'Hello',
+      docs: [
+        {
+          type: 'file',
+          data: `data:application/pdf;base64,${Buffer.from('%PDF-1.4').toString('base64')}`,
+          name: 'report.pdf',
+          mime: 'application/pdf',
+        },
+      ],
+    })
+  })
+
+  it('rejects file parts whose path reaches the prototype', async () => {
+    const formData = new FormData()
+    formData.append('message', JSON.stringify('Hello'))
+    formData.append(filePartName(['__proto__', 'polluted']), new File(['x'], 'x.txt'))
+    const params = Promise.resolve({ id: 'workflow-1' })
+
+    const response = await POST(createMultipartRequest(formData) as any, { params })
+    const body = await response.json()
+
+    expect(response.status).toBe(400)
+    expect(body.error).toBe('Invalid multipart request body')
+    expect(({} as Record<string, unknown>).polluted).toBeUndefined()
+    expect(mockEnqueueWorkspaceDispatch).not.toHaveBeenCalled()
+  })
+
+  it('returns 400 for a malformed field instead of running without input', async () => {
+    const formData = new FormData()
+    formData.append('message', 'not json')
+    const params = Promise.resolve({ id: 'workflow-1' })
+
+    const response = await POST(createMultipartRequest(formData) as any, { params })
+    const body = await response.json()
+
+    expect(response.status).toBe(400)
+    expect(body.error).toBe('Invalid multipart request body')
+    expect(mockPreprocessExecution).not.toHaveBeenCalled()
+    expect(mockEnqueueWorkspaceDispatch).not.toHaveBeenCalled()
+  })
+})
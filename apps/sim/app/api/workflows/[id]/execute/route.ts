@@ -326,6 +326,59 @@ async function enqueueDirectWorkflowExecution(
   })
 }
 
+const UNSAFE_PATH_KEYS = new Set(['__proto__', 'constructor', 'prototype'])
+
+/**
+ * Parse a multipart/form-data execute request (sent by the Python SDK for file inputs).
+ *
+ * String fields carry JSON-encoded top-level body values. File parts are named with the
+ * percent-encoded JSON path of the input value they replace and are converted to the same base64
+ * file objects that JSON clients send, so downstream file handling is unchanged.
+ */
+async function parseMultipartBody(req: NextRequest): Promise<Record<string, any>> {
+  const formData = await req.formData()
+  const body: Record<string, any> = {}
+  const fileParts: Array<[unknown, File]> = []
+
+  for (const [name, value] of formData.entries()) {
+    if (typeof value === 'string') {
+      body[name] = JSON.parse(value)
+    } else {
+      fileParts.push([JSON.parse(decodeURIComponent(name)), value])
+    }
+  }
+
+  for (const [path, file] of fileParts) {
+    if (
+      !Array.isArray(path) ||
+      path.length === 0 ||
+      path.some((key) => typeof key !== 'string' && typeof key !== 'number') ||
+      path.some((key) => UNSAFE_PATH_KEYS.has(String(key)))
+    ) {
+      throw new Error(`Invalid file field path: ${JSON.stringify(path)}`)
+    }
+
+    let target: any = body
+    for (const key of path.slice(0, -1)) {
+      target = target?.[key]
+    }
+    if (target === null || typeof target !== 'object') {
+      throw new Error(`Invalid file field path: ${JSON.stringify(path)}`)
+    }
+
+    const mime = file.type || 'application/octet-stream'
+    const base64Data = Buffer.from(await file.arrayBuffer()).toString('base64')
+    target[path[path.length - 1]] = {
+      type: 'file',
+      data: `data:${mime};base64,${base64Data}`,
+      name: file.name,
+      mime,
+    }
+  }
+
+  return body
+}
+
 /**
  * POST /api/workflows/[id]/execute
  *
@@ -413,13 +466,28 @@ async function handleExecutePost(
     }
 
     let body: any = {}
-    try {
-      const text = await req.text()
-      if (text) {
-        body = JSON.parse(text)
+    if (req.headers.get('content-type')?.startsWith('multipart/form-data')) {
+      // A multipart body always carries the input, so failing to parse it must not run the
+      // workflow with the empty defaults
+      try {
+        body = await parseMultipartBody(req)
+      } catch (error) {
+        const errorMessage = error instanceof Error ? error.message : String(error)
+        reqLogger.warn('Failed to parse multipart request body', { error: errorMessage })
+        return NextResponse.json(
+          { error: 'Invalid multipart request body', details: errorMessage },
+          { status: 400 }
+        )
+      }
+    } else {
+      try {
+        const text = await req.text()
+        if (text) {
+          body = JSON.parse(text)
+        }
+      } catch (error) {
+        reqLogger.warn('Failed to parse request body, using defaults')
       }
-    } catch (error) {
-      reqLogger.warn('Failed to parse request body, using defaults')
     }
 
     const validation = ExecuteWorkflowSchema.safeParse(body)
@@ -0,0 +1,438 @@
+"""
+Tests for the Presidio PII detection worker
+
+Run with: python -m pytest apps/sim/lib/guardrails/test_validate_pii.py
+"""
+
+import io
+import json
+import queue
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("presidio_analyzer")
+spacy = pytest.importorskip("spacy")
+
+from presidio_analyzer import AnalyzerEngine, EntityRecognizer, Pattern, PatternRecognizer
+from presidio_analyzer.nlp_engine import NlpEngineProvider
+from presidio_analyzer.predefined_recognizers import (
+    CreditCardRecognizer,
+    EmailRecognizer,
+    IpRecognizer,
+    PhoneRecognizer,
+    UsSsnRecognizer,
+)
+
+import validate_pii
+
+# Texts the pattern fast path must agree with Presidio's recognizers on
+CORPUS = (
+    "Call me at +44 20 7946 0958",
+    "+49 30 901820",
+    "My phone number is 212-555-5555 or (212) 555-5555",
+    "Reach the office on 07700 900123 or 1-800-555-0199",
+    "host ::1 is up, fe80::1%eth0 is not",
+    "2001:db8::ff00:42:8329 and ::ffff:10.0.0.1",
+    "10.0.0.1, 192.168.1.1/24 and 10.0.0.256",
+    "ssn 123-45-6789",
+    "ssn 234-56-7890, 234 56 7890 and 123456789",
+    "zip 12345-6789",
+    "card 4111 1111 1111 1111 or 4111-1111-1111-1112",
+    "amex 378282246310005",
+    "mail a.b@c.d.com, not x@y",
+    "Ärger mit 234-56-7890 und a@b.co",
+    "nothing to see here",
+)
+
+PRESIDIO_RECOGNIZERS = (
+    CreditCardRecognizer(),
+    EmailRecognizer(),
+    IpRecognizer(),
+    PhoneRecognizer(),
+    UsSsnRecognizer(),
+)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def analyzer(tmp_path_factory):
+    """An English analyzer on a blank spaCy pipeline, so no model download is needed."""
+    model_path = tmp_path_factory.mktemp("blank_en")
+    spacy.blank("en").to_disk(model_path)
+    analyzer = AnalyzerEngine(nlp_engine=NlpEngineProvider(nlp_configuration={
+        "nlp_engine_name": "spacy",
+        "models": [{"lang_code": "en", "model_name": str(model_path)}],
+    }).create_engine())
+
+    validate_pii._ANALYZERS["en"] = analyzer
+    yield analyzer
+    validate_pii._ANALYZERS.pop("en", None)
+    validate_pii._PREFILTERS.clear()
+
+
+@pytest.fixture(params=["hyperscan", "re"])
+def prefilter(request, monkeypatch):
+    """Run each test with and without the hyperscan prefilter."""
+    if request.param == "hyperscan" and validate_pii.hyperscan is None:
+        pytest.skip("hyperscan is not installed")
+    if request.param == "re":
+        monkeypatch.setattr(validate_pii, "hyperscan", None)
+    return request.param
+
+
+def spans(results):
+    """Comparable (type, start, end, score) tuples for recognizer results."""
+    return sorted((r.entity_type, r.start, r.end, r.score) for r in results)
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_pattern_fast_path_matches_presidio_recognizers(prefilter, text):
+    """Test the fast path finds exactly what Presidio's own recognizers find."""
+    entity_types = sorted(validate_pii.PATTERN_ENTITIES)
+    expected = EntityRecognizer.remove_duplicates([
+        result
+        for recognizer in PRESIDIO_RECOGNIZERS
+        for result in recognizer.analyze(text, entity_types, None)
+    ])
+
+    assert spans(validate_pii.detect_pattern_entities(text, entity_types)) == spans(expected)
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_pattern_fast_path_matches_analyzer(analyzer, prefilter, text):
+    """Test the fast path agrees with a full AnalyzerEngine run, one entity type at a time."""
+    for entity_type in sorted(validate_pii.PATTERN_ENTITIES):
+        assert spans(validate_pii.detect_pattern_entities(text, [entity_type])) == spans(
+            analyzer.analyze(text=text, entities=[entity_type], language="en")
+        )
+
+
+def test_pattern_fast_path_finds_international_phone_numbers(prefilter):
+    """Test phone numbers outside North America are detected."""
+    result = validate_pii.detect_pii("Call me at +44 20 7946 0958", ["PHONE_NUMBER"])
+    assert result["passed"] is False
+    assert result["detectedEntities"][0]["text"] == "+44 20 7946 0958"
+
+
+def test_pattern_fast_path_rejects_invalid_ssn(prefilter):
+    """Test SSNs Presidio's recognizer rejects do not block the text."""
+    assert validate_pii.detect_pii("ssn 123-45-6789", ["US_SSN"])["passed"] is True
+
+
+def test_decode_request_accepts_lone_surrogates():
+    """Test requests holding a lone UTF-16 surrogate decode with their ID."""
+    payload = memoryview(b'{"id": "7", "text": "abc \\ud83d +44 20 7946 0958"}')
+
+    request_id, data, error = validate_pii.decode_request(payload)
+
+    assert (request_id, error) == ("7", None)
+    assert data["text"] == "abc \ufffd +44 20 7946 0958"
+
+
+def test_dumps_escapes_lone_surrogates():
+    """Test results holding a lone surrogate still encode."""
+    assert validate_pii.dumps({"error": "Invalid mode: \ud83d"}) == b'{"error": "Invalid mode: \\ud83d"}'
+
+
+def test_missing_language_model_fails_fast(monkeypatch):
+    """Test a language whose spaCy model is not installed errors instead of downloading it."""
+    monkeypatch.setattr(validate_pii, "is_package", lambda name: False)
+    monkeypatch.delitem(validate_pii._ANALYZERS, "es", raising=False)
+
+    result = validate_pii.detect_pii("Hola Juan", ["PERSON"], language="es")
+
+    assert result["passed"] is False
+    assert "es_core_news_md" in result["error"]
+    assert "es" not in validate_pii._ANALYZERS
+
+
+@pytest.mark.parametrize("payload, error", [
+    (b'{"id": "1", "text": "Bob", "entityTypes": "PERSON"}', "entityTypes must be a list of strings"),
+    (b'{"id": "1", "text": "Bob", "entityTypes": [1]}', "entityTypes must be a list of strings"),
+    (b'{"id": "1", "text": 5}', "text must be a string"),
+    (b'{"id": "1", "text": "Bob", "returnEntities": "no"}', "returnEntities must be a boolean"),
+])
+def test_decode_request_rejects_invalid_fields(payload, error):
+    """Test mistyped fields become an error result for that request."""
+    request_id, data, result = validate_pii.decode_request(memoryview(payload))
+
+    assert (request_id, data) == ("1", None)
+    assert result["error"] == f"Invalid request: {error}"
+
+
+def test_process_batch_answers_every_request(capsysbinary):
+    """Test requests that fail before analysis do not stop the rest of the batch."""
+    payloads = (
+        b'{"id": "1", "text": "Bob", "entityTypes": null}',
+        b'{"id": "2", "text": "Bob", "entityTypes": ["PERSON"], "mode": "\\ud83d"}',
+        b'{"id": "3", "text": "a@b.co", "entityTypes": ["EMAIL_ADDRESS"]}',
+    )
+
+    validate_pii.process_batch([validate_pii.decode_request(memoryview(p)) for p in payloads])
+
+    lines = capsysbinary.readouterr().out.splitlines()
+    results = [validate_pii.loads(memoryview(line.split(b"=", 1)[1])) for line in lines]
+    assert [r["id"] for r in results] == ["1", "2", "3"]
+    assert results[0]["result"]["passed"] is True
+    assert "error" in results[1]["result"]
+    assert results[2]["result"]["error"] == "PII detected: 1 EMAIL_ADDRESS"
+
+
+@pytest.fixture
+def empty_result_cache(monkeypatch):
+    """A fresh result cache, restored afterwards."""
+    monkeypatch.setattr(validate_pii, "_RESULT_CACHE", OrderedDict())
+    monkeypatch.setattr(validate_pii, "_result_cache_bytes", 0)
+
+
+@pytest.fixture
+def analyzed(empty_result_cache, monkeypatch):
+    """Texts detect_pii analyzes, with analysis stubbed to echo the text in mask mode."""
+    texts = []
+
+    def detect(text, entity_types, mode, language, nlp_artifacts, return_entities):
+        texts.append(text)
+        return {"passed": True, "detectedEntities": [], "maskedText": text if mode == "mask" else None}
+
+    monkeypatch.setattr(validate_pii, "_detect_pii", detect)
+    return texts
+
+
+def test_result_cache_returns_repeated_results(analyzed):
+    """Test a repeated request is answered from the cache."""
+    first = validate_pii.detect_pii("Bob", ["PERSON", "LOCATION"])
+
+    assert validate_pii.detect_pii("Bob", ["LOCATION", "PERSON", "PERSON"]) is first
+    assert analyzed == ["Bob"]
+
+
+@pytest.mark.parametrize("options", [
+    {"entity_types": ["PERSON", "LOCATION", "NRP"]},
+    {"mode": "mask"},
+    {"language": "es"},
+    {"return_entities": False},
+], ids=lambda options: next(iter(options)))
+def test_result_cache_key_covers_request_options(analyzed, options):
+    """Test requests for the same text with different options are analyzed separately."""
+    validate_pii.detect_pii("Bob", ["PERSON", "LOCATION"])
+    validate_pii.detect_pii("Bob", **{"entity_types": ["PERSON", "LOCATION"], **options})
+
+    assert analyzed == ["Bob", "Bob"]
+
+
+def test_result_cache_evicts_least_recently_used(analyzed, monkeypatch):
+    """Test the cache holds at most RESULT_CACHE_SIZE entries, evicting the least recently used."""
+    monkeypatch.setattr(validate_pii, "RESULT_CACHE_SIZE", 2)
+
+    for text in ("Ann", "Bob", "Ann", "Cat", "Ann", "Bob"):
+        validate_pii.detect_pii(text, ["PERSON"])
+
+    assert analyzed == ["Ann", "Bob", "Cat", "Bob"]
+    assert len(validate_pii._RESULT_CACHE) == 2
+
+
+def test_result_cache_limits_total_size(analyzed, monkeypatch):
+    """Test large mask-mode results are evicted by total size, and oversized ones not cached."""
+    monkeypatch.setattr(validate_pii, "RESULT_CACHE_BYTES", 10)
+
+    for text in ("aaaa", "bbbb", "cccc", "a" * 11, "a" * 11, "bbbb", "aaaa"):
+        validate_pii.detect_pii(text, ["PERSON"], mode="mask")
+
+    assert analyzed == ["aaaa", "bbbb", "cccc", "a" * 11, "a" * 11, "aaaa"]
+    assert validate_pii._result_cache_bytes == 8
+
+
+def test_result_cache_skips_long_texts(analyzed, monkeypatch):
+    """Test texts longer than MAX_CACHED_TEXT are analyzed every time."""
+    monkeypatch.setattr(validate_pii, "MAX_CACHED_TEXT", 3)
+
+    validate_pii.detect_pii("Bobby", ["PERSON"])
+    validate_pii.detect_pii("Bobby", ["PERSON"])
+
+    assert analyzed == ["Bobby", "Bobby"]
+    assert not validate_pii._RESULT_CACHE
+
+
+def test_process_batch_skips_spacy_for_cached_texts(analyzer, empty_result_cache, monkeypatch, capsysbinary):
+    """Test texts with a cached result are left out of the batch's spaCy run."""
+    validate_pii.detect_pii("Alice", ["PERSON"])
+    batched = []
+    process_texts = analyzer.nlp_engine.process_batch
+
+    def process_batch(texts, *args, **kwargs):
+        batched.append(list(texts))
+        return process_texts(texts, *args, **kwargs)
+
+    monkeypatch.setattr(analyzer.nlp_engine, "process_batch", process_batch)
+    validate_pii.process_batch([
+        ("1", {"text": "Alice", "entityTypes": ["PERSON"]}, None),
+        ("2", {"text": "Bob", "entityTypes": ["PERSON"]}, None),
+    ])
+
+    assert batched == [["Bob"]]
+    assert len(capsysbinary.readouterr().out.splitlines()) == 2
+
+
+def frame(request):
+    """A request as the TS wrapper sends it: a 4-byte big-endian length, then the JSON."""
+    payload = json.dumps(request).encode("utf-8")
+    return len(payload).to_bytes(4, "big") + payload
+
+
+class ShortReads(io.BytesIO):
+    """A stream whose readinto returns at most 3 bytes per call, like a slow pipe."""
+
+    def readinto(self, buffer):
+        return super().readinto(memoryview(buffer)[:3])
+
+
+@pytest.mark.parametrize("stream", [io.BytesIO, ShortReads])
+def test_read_requests_decodes_frames_until_eof(monkeypatch, stream):
+    """Test frames are decoded in order, growing the buffer, until a truncated frame ends input."""
+    monkeypatch.setattr(validate_pii, "READ_BUFFER_SIZE", 64)
+    large = "Bob " * 100
+    data = (
+        frame({"id": "1", "text": "Bob"})
+        + frame({"id": "2", "text": large})
+        + frame({"id": "3", "text": "Ann"})
+        + frame({"id": "4", "text": "Cat"})[:-2]
+    )
+    monkeypatch.setattr(validate_pii.sys, "stdin", SimpleNamespace(buffer=stream(data)))
+    requests = queue.Queue()
+
+    validate_pii.read_requests(requests)
+
+    assert [requests.get_nowait() for _ in range(4)] == [
+        ("1", {"id": "1", "text": "Bob"}, None),
+        ("2", {"id": "2", "text": large}, None),
+        ("3", {"id": "3", "text": "Ann"}, None),
+        None,
+    ]
+    assert requests.empty()
+
+
+def test_read_requests_stops_at_truncated_length_prefix(monkeypatch):
+    """Test EOF inside a length prefix ends input after the complete frames."""
+    data = frame({"id": "1", "text": "Bob"}) + b"\x00\x00"
+    monkeypatch.setattr(validate_pii.sys, "stdin", SimpleNamespace(buffer=io.BytesIO(data)))
+    requests = queue.Queue()
+
+    validate_pii.read_requests(requests)
+
+    assert requests.get_nowait() == ("1", {"id": "1", "text": "Bob"}, None)
+    assert requests.get_nowait() is None
+    assert requests.empty()
+
+
+def queued(*items):
+    """A request queue holding items, as read_requests leaves it."""
+    requests = queue.Queue()
+    for item in items:
+        requests.put(item)
+    return requests
+
+
+def request(request_id):
+    """A decoded request with the given ID."""
+    return (request_id, {"id": request_id, "text": "Bob"}, None)
+
+
+def test_next_batch_caps_batch_size(monkeypatch):
+    """Test a batch holds at most MAX_BATCH requests, leaving the rest queued."""
+    monkeypatch.setattr(validate_pii, "MAX_BATCH", 3)
+    requests = queued(*(request(str(i)) for i in range(5)))
+
+    batch, done = validate_pii.next_batch(requests)
+
+    assert (batch, done) == ([request("0"), request("1"), request("2")], False)
+    assert requests.qsize() == 2
+
+
+def test_next_batch_stops_at_batch_window(monkeypatch):
+    """Test requests still queued once BATCH_WINDOW has passed wait for the next batch."""
+    clock = iter([0.0, 0.001, 0.01])
+    monkeypatch.setattr(validate_pii, "time", SimpleNamespace(monotonic=lambda: next(clock)))
+    requests = queued(request("0"), request("1"), request("2"))
+
+    batch, done = validate_pii.next_batch(requests)
+
+    assert (batch, done) == ([request("0"), request("1")], False)
+    assert requests.qsize() == 1
+
+
+@pytest.mark.parametrize("items, expected", [
+    pytest.param([request("0"), request("1"), None], [request("0"), request("1")], id="partial-batch"),
+    pytest.param([None], [], id="empty"),
+])
+def test_next_batch_returns_requests_read_before_eof(items, expected):
+    """Test EOF returns the requests already read and reports stdin closed."""
+    assert validate_pii.next_batch(queued(*items)) == (expected, True)
+
+
+def test_block_mode_without_entities_still_summarizes(prefilter):
+    """Test returnEntities=False keeps the block-mode error summary but omits the spans."""
+    result = validate_pii.detect_pii("a@b.co and c@d.co", ["EMAIL_ADDRESS"], return_entities=False)
+
+    assert result["passed"] is False
+    assert result["error"] == "PII detected: 2 EMAIL_ADDRESS"
+    assert result["detectedEntities"] == []
+
+
+def test_mask_mode_ignores_return_entities(prefilter):
+    """Test mask mode returns the spans even when returnEntities is False."""
+    result = validate_pii.detect_pii("mail a@b.co", ["EMAIL_ADDRESS"], mode="mask", return_entities=False)
+
+    assert result["maskedText"] == "mail <EMAIL_ADDRESS>"
+    assert [entity["text"] for entity in result["detectedEntities"]] == ["a@b.co"]
+
+
+@pytest.fixture
+def employee_ids(analyzer):
+    """A recognizer for EMPLOYEE_ID, a type the guardrails block does not offer."""
+    recognizer = PatternRecognizer(
+        supported_entity="EMPLOYEE_ID",
+        name="EmployeeIdRecognizer",
+        patterns=[Pattern("employee id", r"\bEMP-\d{4}\b", 0.9)],
+    )
+    analyzer.registry.add_recognizer(recognizer)
+    yield
+    analyzer.registry.remove_recognizer("EmployeeIdRecognizer")
+
+
+def test_mask_mode_replaces_each_entity_with_its_type(employee_ids, empty_result_cache):
+    """Test mask mode replaces every type, listed or not, with <TYPE> and leaves MASK_OPERATORS as built."""
+    operators = dict(validate_pii.MASK_OPERATORS)
+
+    result = validate_pii.detect_pii(
+        "EMP-1234 mailed a@b.co", ["EMPLOYEE_ID", "EMAIL_ADDRESS"], mode="mask"
+    )
+
+    assert result["passed"] is True
+    assert result["maskedText"] == "<EMPLOYEE_ID> mailed <EMAIL_ADDRESS>"
+    assert sorted(entity["type"] for entity in result["detectedEntities"]) == ["EMAIL_ADDRESS", "EMPLOYEE_ID"]
+    assert "EMPLOYEE_ID" not in validate_pii.SUPPORTED_ENTITIES
+    assert validate_pii.MASK_OPERATORS == operators
+    assert all(validate_pii.MASK_OPERATORS[key] is operator for key, operator in operators.items())
+
+
+@pytest.fixture
+def no_analyzer(monkeypatch):
+    """Fail any test that reaches the analyzer."""
+    def get_analyzer(language="en"):
+        raise AssertionError("analyzer used")
+
+    monkeypatch.setattr(validate_pii, "_get_analyzer", get_analyzer)
+
+
+def test_pattern_fast_path_skips_text_without_required_chars(no_analyzer):
+    """Test ASCII text with no character a requested type needs is ruled out without the analyzer."""
+    entity_types = sorted(validate_pii.PATTERN_ENTITIES)
+
+    assert validate_pii.detect_pattern_entities("nothing to see here", entity_types) == []
+
+
+def test_pattern_fast_path_checks_non_ascii_text(no_analyzer):
+    """Test non-ASCII text goes to the analyzer, as its digits need not be ASCII."""
+    with pytest.raises(AssertionError, match="analyzer used"):
+        validate_pii.detect_pattern_entities("Tel. \u0661\u0662\u0663\u0664", ["PHONE_NUMBER"])
@@ -5,30 +5,346 @@ PII Detection Validator using Microsoft Presidio
 Detects personally identifiable information (PII) in text and either:
 - Blocks the request if PII is detected (block mode)
 - Masks the PII and returns the masked text (mask mode)
+
+Runs as a long-lived worker: the Presidio engines are built once, then each
+JSON request on stdin, framed by a 4-byte big-endian length prefix, is
+answered with one __SIM_RESULT__ line.
+Requests arriving close together are micro-batched so spaCy tokenizes and
+tags their texts in a single pipe() call.
 """
 
 import sys
+import re
 import json
-from typing import List, Dict, Any
+import queue
+import threading
+import time
+from collections import Counter, OrderedDict
+from hashlib import blake2b
+from typing import List, Dict, Any, Optional, Set, Tuple
 
 try:
-    from presidio_analyzer import AnalyzerEngine
+    from presidio_analyzer import AnalyzerEngine, PatternRecognizer, RecognizerResult
+    from presidio_analyzer.nlp_engine import NlpArtifacts, NlpEngineProvider
     from presidio_anonymizer import AnonymizerEngine
     from presidio_anonymizer.entities import OperatorConfig
+    from spacy.util import is_package
+except ImportError:
+    # Reported to the caller as the worker's startup failure
+    sys.stderr.write("Presidio not installed. Run: pip install presidio-analyzer presidio-anonymizer\n")
+    sys.exit(1)
+
+try:
+    import orjson
 except ImportError:
-    print(json.dumps({
-        "passed": False,
-        "error": "Presidio not installed. Run: pip install presidio-analyzer presidio-anonymizer",
-        "detectedEntities": []
-    }))
-    sys.exit(0)
+    # Falls back to the stdlib json module when running outside the venv
+    orjson = None
+
+try:
+    import hyperscan
+except ImportError:
+    # Pattern entities are then matched one regex at a time with the re module
+    hyperscan = None
+
+
+# Engines are created lazily and then reused for the lifetime of the process.
+# Analyzers are keyed by language, so each language's spaCy model loads at most once.
+_ANALYZERS: Dict[str, AnalyzerEngine] = {}
+_ANONYMIZER: Optional[AnonymizerEngine] = None
+
+# spaCy models for the non-English languages offered by the guardrails block. They are
+# not downloaded on demand (see _get_analyzer) and must be installed for their language to work.
+SPACY_MODELS = {
+    "es": "es_core_news_md",
+    "it": "it_core_news_md",
+    "pl": "pl_core_news_md",
+    "fi": "fi_core_news_md",
+}
+
+# Results of recent analyzer runs, keyed by a hash of the text and the request options,
+# so repeated texts (retries, replays) skip Presidio. Very long texts are not cached, and
+# least recently used entries are evicted past RESULT_CACHE_SIZE entries or, since mask-mode
+# results hold the whole masked text, past RESULT_CACHE_BYTES of text in total.
+RESULT_CACHE_SIZE = 4096
+RESULT_CACHE_BYTES = 64 << 20
+MAX_CACHED_TEXT = 1 << 20
+_RESULT_CACHE: "OrderedDict[bytes, Tuple[Dict[str, Any], int]]" = OrderedDict()
+_result_cache_bytes = 0
+
+# Approximate memory held by each detected entity's dict, on top of its text
+CACHED_ENTITY_BYTES = 256
+
+# Lone UTF-16 surrogates, which JS strings can carry (e.g. when sliced through an emoji)
+# but UTF-8, and so spaCy and the result encoder, cannot
+LONE_SURROGATE = re.compile("[\ud800-\udfff]")
+
+# Request fields read by handle_request, with the type each must have when not null
+REQUEST_FIELDS: Dict[str, Tuple[type, str]] = {
+    "text": (str, "a string"),
+    "entityTypes": (list, "a list of strings"),
+    "mode": (str, "a string"),
+    "language": (str, "a string"),
+    "returnEntities": (bool, "a boolean"),
+}
+
+# Initial size of the reusable stdin frame buffer; it grows to fit larger requests
+READ_BUFFER_SIZE = 1 << 20
+
+# Micro-batching: wait up to BATCH_WINDOW seconds for up to MAX_BATCH requests
+MAX_BATCH = 32
+BATCH_WINDOW = 0.005
+
+# Entity types found by Presidio's pattern and phone number recognizers alone. Requests
+# limited to these skip spaCy: the analyzer runs with empty NLP artifacts, so spans are
+# those of a full analysis and only the context-word score boost, which needs lemmas, is lost.
+PATTERN_ENTITIES = frozenset({"CREDIT_CARD", "EMAIL_ADDRESS", "IP_ADDRESS", "PHONE_NUMBER", "US_SSN"})
+
+# Characters every match of a pattern entity contains at least one of. Digits are listed
+# as ASCII only, so the check is skipped for non-ASCII text where \d matches other digits.
+REQUIRED_CHARS: Dict[str, frozenset] = {
+    "EMAIL_ADDRESS": frozenset("@"),
+    "PHONE_NUMBER": frozenset("0123456789"),
+    "IP_ADDRESS": frozenset(".:"),
+    "CREDIT_CARD": frozenset("0123456789"),
+    "US_SSN": frozenset("0123456789"),
+}
+
+# With hyperscan available, each language's pattern recognizers are compiled into one
+# prefilter database (see _get_prefilter), keyed by language like _ANALYZERS
+_PREFILTERS: Dict[str, "Prefilter"] = {}
+
+
+# Entity types offered by the guardrails block (see SUPPORTED_PII_ENTITIES in validate_pii.ts)
+SUPPORTED_ENTITIES = (
+    "CREDIT_CARD", "CRYPTO", "DATE_TIME", "EMAIL_ADDRESS", "IBAN_CODE", "IP_ADDRESS", "NRP",
+    "LOCATION", "PERSON", "PHONE_NUMBER", "MEDICAL_LICENSE", "URL",
+    "US_BANK_NUMBER", "US_DRIVER_LICENSE", "US_ITIN", "US_PASSPORT", "US_SSN",
+    "UK_NHS", "UK_NINO",
+    "ES_NIF", "ES_NIE", "IT_FISCAL_CODE", "IT_DRIVER_LICENSE", "IT_VAT_CODE", "IT_PASSPORT",
+    "IT_IDENTITY_CARD", "PL_PESEL", "SG_NRIC_FIN", "SG_UEN", "AU_ABN", "AU_ACN", "AU_TFN",
+    "AU_MEDICARE", "IN_PAN", "IN_AADHAAR", "IN_VEHICLE_REGISTRATION", "IN_VOTER", "IN_PASSPORT",
+    "FI_PERSONAL_IDENTITY_CODE", "KR_RRN", "TH_TNIN",
+)
+
+# Mask-mode operators, built once: each type is replaced with <ENTITY_TYPE>. Presidio's
+# default "replace" operator produces the same placeholder for any type not listed, and
+# including DEFAULT up front stops the anonymizer from adding it to this shared dict.
+MASK_OPERATORS: Dict[str, OperatorConfig] = {
+    **{entity_type: OperatorConfig("replace", {"new_value": f"<{entity_type}>"}) for entity_type in SUPPORTED_ENTITIES},
+    "DEFAULT": OperatorConfig("replace"),
+}
+
+
+# A request as queued for processing: (request ID, request data, error result)
+DecodedRequest = Tuple[Any, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+# A compiled prefilter: (hyperscan database, entity type of each expression id,
+# entity types that have a recognizer the database cannot stand in for)
+Prefilter = Tuple[Any, List[str], frozenset]
+
+
+def _get_analyzer(language: str = "en") -> AnalyzerEngine:
+    """Return the shared AnalyzerEngine for a language, loading its NLP model on first use"""
+    analyzer = _ANALYZERS.get(language)
+    if analyzer is None:
+        if language == "en":
+            # Presidio's default configuration is English-only
+            analyzer = AnalyzerEngine()
+        else:
+            model_name = SPACY_MODELS.get(language)
+            if model_name is None:
+                raise ValueError(f"Unsupported language: {language}")
+            # Presidio would otherwise download the model here, blocking every other request
+            # on this thread for the length of the download
+            if not is_package(model_name):
+                raise ValueError(
+                    f"spaCy model {model_name} for language {language} is not installed. "
+                    f"Run: python -m spacy download {model_name}"
+                )
+            nlp_engine = NlpEngineProvider(nlp_configuration={
+                "nlp_engine_name": "spacy",
+                "models": [{"lang_code": language, "model_name": model_name}],
+            }).create_engine()
+            analyzer = AnalyzerEngine(nlp_engine=nlp_engine, supported_languages=[language])
+        _ANALYZERS[language] = analyzer
+    return analyzer
+
+
+def _get_anonymizer() -> AnonymizerEngine:
+    """Return the shared AnonymizerEngine"""
+    global _ANONYMIZER
+    if _ANONYMIZER is None:
+        _ANONYMIZER = AnonymizerEngine()
+    return _ANONYMIZER
+
+
+def uses_pattern_fast_path(entity_types: List[str]) -> bool:
+    """Whether every requested entity type can be detected by regex alone"""
+    return bool(entity_types) and all(entity_type in PATTERN_ENTITIES for entity_type in entity_types)
+
+
+def detect_pattern_entities(text: str, entity_types: List[str], language: str = "en") -> List[RecognizerResult]:
+    """
+    Detect pattern entity types without running the NLP pipeline
+
+    Args:
+        text: Input text to analyze
+        entity_types: Entity types from PATTERN_ENTITIES to detect
+        language: Language code whose recognizers are used
+
+    Returns:
+        Recognizer results ordered by position
+    """
+    # Text without any character the requested types need cannot contain them
+    if text.isascii() and frozenset().union(*(REQUIRED_CHARS[e] for e in entity_types)).isdisjoint(text):
+        return []
+
+    analyzer = _get_analyzer(language)
+
+    # hyperscan works on bytes with ASCII classes, so it only stands in for re on ASCII text
+    entity_types = list(dict.fromkeys(entity_types))
+    prefilter = _get_prefilter(language) if text.isascii() else None
+    if prefilter is not None:
+        present = _scan_pattern_entities(prefilter, text)
+        entity_types = [entity_type for entity_type in entity_types if entity_type in present]
+        if not entity_types:
+            return []
+
+    results = analyzer.analyze(
+        text=text,
+        entities=entity_types,
+        language=language,
+        nlp_artifacts=NlpArtifacts(
+            entities=[], tokens=[], tokens_indices=[], lemmas=[],
+            nlp_engine=analyzer.nlp_engine, language=language
+        )
+    )
+    results.sort(key=lambda result: result.start)
+    return results
+
+
+def _get_prefilter(language: str) -> Optional[Prefilter]:
+    """
+    Return the hyperscan prefilter for a language's pattern recognizers, compiling it on first use
+
+    Each recognizer regex is compiled with HS_FLAG_PREFILTER, so the database may report
+    matches re would not, but never misses one; None if hyperscan is not installed.
+    """
+    if hyperscan is None:
+        return None
+    if language not in _PREFILTERS:
+        expressions: List[bytes] = []
+        flags: List[int] = []
+        ids: List[str] = []
+        always_run: Set[str] = set()
+        for recognizer in _get_analyzer(language).registry.get_recognizers(
+            language=language, entities=sorted(PATTERN_ENTITIES)
+        ):
+            entity_types = PATTERN_ENTITIES.intersection(recognizer.supported_entities)
+            if not isinstance(recognizer, PatternRecognizer):
+                # e.g. the phonenumbers-based PhoneRecognizer
+                always_run.update(entity_types)
+                continue
+            regex_flags = recognizer.global_regex_flags or 0
+            hs_flags = hyperscan.HS_FLAG_PREFILTER | hyperscan.HS_FLAG_SINGLEMATCH
+            if regex_flags & re.IGNORECASE:
+                hs_flags |= hyperscan.HS_FLAG_CASELESS
+            if regex_flags & re.MULTILINE:
+                hs_flags |= hyperscan.HS_FLAG_MULTILINE
+            if regex_flags & re.DOTALL:
+                hs_flags |= hyperscan.HS_FLAG_DOTALL
+            for pattern in recognizer.patterns:
+                for entity_type in entity_types:
+                    expressions.append(pattern.regex.encode())
+                    flags.append(hs_flags)
+                    ids.append(entity_type)
+
+        database = None
+        if expressions:
+            database = hyperscan.Database()
+            database.compile(expressions=expressions, ids=list(range(len(ids))), flags=flags)
+        _PREFILTERS[language] = (database, ids, frozenset(always_run))
+    return _PREFILTERS[language]
+
+
+def _scan_pattern_entities(prefilter: Prefilter, text: str) -> Set[str]:
+    """
+    Find which pattern entity types may occur in ASCII text, in one hyperscan pass
+
+    Types missing from the result cannot occur in the text, so their recognizers are
+    skipped; the analyzer then finds the actual spans of the others.
+    """
+    database, ids, always_run = prefilter
+    present = set(always_run)
+
+    def on_match(pattern_id: int, start: int, end: int, flags: int, context: Any) -> None:
+        present.add(ids[pattern_id])
+
+    if database is not None:
+        database.scan(text.encode("ascii"), match_event_handler=on_match)
+    return present
+
+
+def extract_entities(text: str, results: List[RecognizerResult]) -> List[Dict[str, Any]]:
+    """Convert analyzer results into the detectedEntities payload"""
+    return [
+        {
+            "type": result.entity_type,
+            "start": result.start,
+            "end": result.end,
+            "score": result.score,
+            "text": text[result.start:result.end]
+        }
+        for result in results
+    ]
+
+
+def _result_cache_key(
+    text: str,
+    entity_types: List[str],
+    mode: str,
+    language: str,
+    return_entities: bool
+) -> Optional[bytes]:
+    """Cache key for a request that needs the NLP analyzer, or None if it should not be cached"""
+    if len(text) > MAX_CACHED_TEXT or uses_pattern_fast_path(entity_types):
+        return None
+    return b"|".join([
+        blake2b(text.encode("utf-8"), digest_size=16).digest(),
+        str(mode).encode("utf-8"),
+        str(language).encode("utf-8"),
+        b"1" if return_entities else b"0",
+        b",".join(sorted(entity_type.encode("utf-8") for entity_type in set(entity_types))),
+    ])
+
+
+def _cached_result_size(result: Dict[str, Any]) -> int:
+    """Approximate memory held by a cached result, counted towards RESULT_CACHE_BYTES"""
+    return len(result.get("maskedText") or "") + sum(
+        len(entity["text"]) + CACHED_ENTITY_BYTES for entity in result["detectedEntities"]
+    )
+
+
+def _cache_result(key: bytes, result: Dict[str, Any]) -> None:
+    """Add a result to the cache, evicting the least recently used entries over its limits"""
+    global _result_cache_bytes
+    size = _cached_result_size(result)
+    if size > RESULT_CACHE_BYTES:
+        return
+    _RESULT_CACHE[key] = (result, size)
+    _result_cache_bytes += size
+    while len(_RESULT_CACHE) > RESULT_CACHE_SIZE or _result_cache_bytes > RESULT_CACHE_BYTES:
+        _, (_, evicted_size) = _RESULT_CACHE.popitem(last=False)
+        _result_cache_bytes -= evicted_size
 
 
 def detect_pii(
     text: str,
     entity_types: List[str],
     mode: str = "block",
-    language: str = "en"
+    language: str = "en",
+    nlp_artifacts: Optional[NlpArtifacts] = None,
+    return_entities: bool = True
 ) -> Dict[str, Any]:
     """
     Detect PII in text using Presidio
@@ -38,131 +354,323 @@ def detect_pii(
         entity_types: List of PII entity types to detect (e.g., ["PERSON", "EMAIL_ADDRESS"])
         mode: "block" to fail validation if PII found, "mask" to return masked text
         language: Language code (default: "en")
+        nlp_artifacts: Pre-computed spaCy output for text (e.g. from a batch)
+        return_entities: Include the detected spans in block mode (mask mode always does)
     
     Returns:
         Dictionary with validation result
     """
+    key = _result_cache_key(text, entity_types, mode, language, return_entities)
+    if key is not None:
+        cached = _RESULT_CACHE.get(key)
+        if cached is not None:
+            _RESULT_CACHE.move_to_end(key)
+            return cached[0]
+
     try:
-        # Initialize Presidio engines
-        analyzer = AnalyzerEngine()
-        
-        # Analyze text for PII
-        results = analyzer.analyze(
+        result = _detect_pii(text, entity_types, mode, language, nlp_artifacts, return_entities)
+    except Exception as e:
+        return {
+            "passed": False,
+            "error": f"PII detection failed: {str(e)}",
+            "detectedEntities": []
+        }
+
+    if key is not None:
+        _cache_result(key, result)
+    return result
+
+
+def _detect_pii(
+    text: str,
+    entity_types: List[str],
+    mode: str,
+    language: str,
+    nlp_artifacts: Optional[NlpArtifacts],
+    return_entities: bool
+) -> Dict[str, Any]:
+    """Run detection for detect_pii, letting errors propagate to it"""
+    # Analyze text for PII
+    if uses_pattern_fast_path(entity_types):
+        results = detect_pattern_entities(text, entity_types, language)
+    else:
+        results = _get_analyzer(language).analyze(
             text=text,
             entities=entity_types if entity_types else None,  # None = detect all
-            language=language
+            language=language,
+            nlp_artifacts=nlp_artifacts
         )
+    
+    # If no PII detected, validation passes
+    if not results:
+        return {
+            "passed": True,
+            "detectedEntities": [],
+            "maskedText": None
+        }
+    
+    # Block mode: fail validation if PII detected
+    if mode == "block":
+        entity_summary = Counter(result.entity_type for result in results)
+        summary_str = ", ".join(f"{count} {etype}" for etype, count in entity_summary.items())
         
-        # Extract detected entities
-        detected_entities = []
-        for result in results:
-            detected_entities.append({
-                "type": result.entity_type,
-                "start": result.start,
-                "end": result.end,
-                "score": result.score,
-                "text": text[result.start:result.end]
-            })
-        
-        # If no PII detected, validation passes
-        if not results:
-            return {
-                "passed": True,
-                "detectedEntities": [],
-                "maskedText": None
-            }
-        
-        # Block mode: fail validation if PII detected
-        if mode == "block":
-            entity_summary = {}
-            for entity in detected_entities:
-                entity_type = entity["type"]
-                entity_summary[entity_type] = entity_summary.get(entity_type, 0) + 1
-            
-            summary_str = ", ".join([f"{count} {etype}" for etype, count in entity_summary.items()])
-            
-            return {
-                "passed": False,
-                "error": f"PII detected: {summary_str}",
-                "detectedEntities": detected_entities,
-                "maskedText": None
-            }
-        
-        # Mask mode: anonymize PII and return masked text
-        elif mode == "mask":
-            anonymizer = AnonymizerEngine()
-            
-            # Use <ENTITY_TYPE> as the replacement pattern
-            operators = {}
-            for entity_type in set([r.entity_type for r in results]):
-                operators[entity_type] = OperatorConfig("replace", {"new_value": f"<{entity_type}>"})
-            
-            anonymized_result = anonymizer.anonymize(
-                text=text,
-                analyzer_results=results,
-                operators=operators
-            )
-            
-            return {
-                "passed": True,
-                "detectedEntities": detected_entities,
-                "maskedText": anonymized_result.text
-            }
+        return {
+            "passed": False,
+            "error": f"PII detected: {summary_str}",
+            "detectedEntities": extract_entities(text, results) if return_entities else [],
+            "maskedText": None
+        }
+    
+    # Mask mode: anonymize PII and return masked text
+    elif mode == "mask":
+        # Use <ENTITY_TYPE> as the replacement pattern
+        anonymized_result = _get_anonymizer().anonymize(
+            text=text,
+            analyzer_results=results,
+            operators=MASK_OPERATORS
+        )
         
-        else:
-            return {
-                "passed": False,
-                "error": f"Invalid mode: {mode}. Must be 'block' or 'mask'",
-                "detectedEntities": []
-            }
-            
-    except Exception as e:
+        return {
+            "passed": True,
+            "detectedEntities": extract_entities(text, results),
+            "maskedText": anonymized_result.text
+        }
+    
+    else:
         return {
             "passed": False,
-            "error": f"PII detection failed: {str(e)}",
+            "error": f"Invalid mode: {mode}. Must be 'block' or 'mask'",
             "detectedEntities": []
         }
 
 
-def main():
-    """Main entry point for CLI usage"""
+def handle_request(
+    data: Dict[str, Any],
+    nlp_artifacts: Optional[NlpArtifacts] = None
+) -> Dict[str, Any]:
+    """Validate a single decoded request and run PII detection on it"""
+    text = data.get("text", "")
+    entity_types = data.get("entityTypes", [])
+    mode = data.get("mode", "block")
+    language = data.get("language", "en")
+    return_entities = data.get("returnEntities", True)
+
+    # Validate inputs
+    if not text:
+        return {
+            "passed": False,
+            "error": "No text provided",
+            "detectedEntities": []
+        }
+
+    return detect_pii(text, entity_types, mode, language, nlp_artifacts, return_entities)
+
+
+def loads(payload: memoryview) -> Any:
+    """Decode a JSON request, using orjson when it is installed"""
+    if orjson:
+        try:
+            return orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            # orjson rejects lone UTF-16 surrogates (e.g. from a JS string sliced through
+            # an emoji), which json accepts as it always has
+            pass
+    return json.loads(bytes(payload))
+
+
+def dumps(value: Any) -> bytes:
+    """Encode a JSON result as UTF-8 bytes, using orjson when it is installed"""
+    if orjson:
+        try:
+            return orjson.dumps(value)
+        except orjson.JSONEncodeError:
+            # Raised for strings with lone surrogates, which json escapes as \uXXXX
+            pass
+    return json.dumps(value).encode("utf-8")
+
+
+def write_result(request_id: Any, result: Dict[str, Any]) -> None:
+    """Write a result line tagged with its request ID and flush it immediately"""
+    sys.stdout.buffer.write(b"__SIM_RESULT__=" + dumps({"id": request_id, "result": result}) + b"\n")
+    sys.stdout.buffer.flush()
+
+
+def invalid_request_field(data: Dict[str, Any]) -> Optional[str]:
+    """Describe the first request field with the wrong type, or None if all are valid"""
+    for field, (expected, description) in REQUEST_FIELDS.items():
+        if field in data and not isinstance(data[field], expected):
+            return f"{field} must be {description}"
+    if not all(isinstance(entity_type, str) for entity_type in data.get("entityTypes", [])):
+        return "entityTypes must be a list of strings"
+    return None
+
+
+def decode_request(payload: memoryview) -> DecodedRequest:
+    """Decode one request frame into (request ID, request data, error result)"""
     try:
-        # Read input from stdin
-        input_data = sys.stdin.read()
-        data = json.loads(input_data)
-        
-        text = data.get("text", "")
-        entity_types = data.get("entityTypes", [])
-        mode = data.get("mode", "block")
-        language = data.get("language", "en")
-        
-        # Validate inputs
-        if not text:
-            result = {
+        data = loads(payload)
+        if not isinstance(data, dict):
+            raise ValueError("request must be a JSON object")
+
+        # Null fields take their defaults, as if they were missing
+        request_id = data.get("id")
+        data = {key: value for key, value in data.items() if value is not None}
+        invalid = invalid_request_field(data)
+        if invalid is not None:
+            return request_id, None, {
                 "passed": False,
-                "error": "No text provided",
+                "error": f"Invalid request: {invalid}",
                 "detectedEntities": []
             }
-        else:
-            result = detect_pii(text, entity_types, mode, language)
-        
-        # Output result with marker for parsing
-        print(f"__SIM_RESULT__={json.dumps(result)}")
-        
+
+        text = data.get("text")
+        if text is not None and not text.isascii():
+            # Replaced one for one, so entity offsets still index the caller's text
+            data["text"] = LONE_SURROGATE.sub("\ufffd", text)
+        return request_id, data, None
     except json.JSONDecodeError as e:
-        print(f"__SIM_RESULT__={json.dumps({
-            'passed': False,
-            'error': f'Invalid JSON input: {str(e)}',
-            'detectedEntities': []
-        })}")
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return None, None, {
+            "passed": False,
+            "error": f"Invalid JSON input: {str(e)}",
+            "detectedEntities": []
+        }
     except Exception as e:
-        print(f"__SIM_RESULT__={json.dumps({
-            'passed': False,
-            'error': f'Unexpected error: {str(e)}',
-            'detectedEntities': []
-        })}")
+        return None, None, {
+            "passed": False,
+            "error": f"Unexpected error: {str(e)}",
+            "detectedEntities": []
+        }
+
+
+def read_exact(stream: Any, view: memoryview) -> bool:
+    """Fill view from stream; False if EOF comes first"""
+    filled = 0
+    while filled < len(view):
+        count = stream.readinto(view[filled:])
+        if not count:
+            return False
+        filled += count
+    return True
+
+
+def read_requests(requests: "queue.Queue[Optional[DecodedRequest]]") -> None:
+    """
+    Reader thread: decode length-prefixed request frames from stdin onto the queue,
+    then push None at EOF
+
+    Frames are read into one reused buffer and decoded straight from it, so no
+    per-request bytes object or line splitting is needed.
+    """
+    stdin = sys.stdin.buffer
+    header = memoryview(bytearray(4))
+    buffer = bytearray(READ_BUFFER_SIZE)
+    while read_exact(stdin, header):
+        size = int.from_bytes(header, "big")
+        if size > len(buffer):
+            buffer = bytearray(size)
+        payload = memoryview(buffer)[:size]
+        if not read_exact(stdin, payload):
+            break
+        requests.put(decode_request(payload))
+        payload.release()
+    requests.put(None)
+
+
+def next_batch(requests: "queue.Queue[Optional[DecodedRequest]]") -> Tuple[List[DecodedRequest], bool]:
+    """
+    Block for the next request, then collect any others arriving within BATCH_WINDOW
+
+    Returns:
+        The batch of decoded requests and whether stdin has been closed
+    """
+    first = requests.get()
+    if first is None:
+        return [], True
+
+    batch = [first]
+    deadline = time.monotonic() + BATCH_WINDOW
+    while len(batch) < MAX_BATCH:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            request = requests.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if request is None:
+            return batch, True
+        batch.append(request)
+
+    return batch, False
+
+
+def process_batch(decoded: List[DecodedRequest]) -> None:
+    """Run spaCy over a batch of decoded requests' texts jointly and write each result"""
+    # Group texts by language so each group goes through one nlp.pipe() call;
+    # fast-path and already cached requests do not need spaCy
+    by_language: Dict[str, List[int]] = {}
+    for index, (_, data, _) in enumerate(decoded):
+        if data is None or not data.get("text") or uses_pattern_fast_path(data.get("entityTypes", [])):
+            continue
+        try:
+            key = _result_cache_key(
+                data["text"],
+                data.get("entityTypes", []),
+                data.get("mode", "block"),
+                data.get("language", "en"),
+                data.get("returnEntities", True)
+            )
+        except Exception:
+            # Analyzed on its own below, where the error is reported for this request only
+            continue
+        if key not in _RESULT_CACHE:
+            by_language.setdefault(data.get("language", "en"), []).append(index)
+
+    artifacts: Dict[int, NlpArtifacts] = {}
+    for language, indices in by_language.items():
+        texts = [decoded[i][1]["text"] for i in indices]
+        try:
+            processed = _get_analyzer(language).nlp_engine.process_batch(texts, language, batch_size=len(texts))
+            for index, (_, nlp_artifacts) in zip(indices, processed):
+                artifacts[index] = nlp_artifacts
+        except Exception:
+            # Fall back to per-request analysis, which reports its own errors
+            pass
+
+    for index, (request_id, data, result) in enumerate(decoded):
+        if result is None:
+            try:
+                result = handle_request(data, artifacts.get(index))
+            except Exception as e:
+                result = {
+                    "passed": False,
+                    "error": f"Unexpected error: {str(e)}",
+                    "detectedEntities": []
+                }
+
+        # Output result with marker for parsing
+        write_result(request_id, result)
+
+
+def main():
+    """Worker loop: answer length-prefixed JSON requests from stdin until EOF"""
+    requests: "queue.Queue[Optional[DecodedRequest]]" = queue.Queue()
+    threading.Thread(target=read_requests, args=(requests,), daemon=True).start()
+
+    # Signal the caller that the engines are loaded and requests can be sent
+    sys.stdout.write("__SIM_READY__\n")
+    sys.stdout.flush()
+
+    done = False
+    while not done:
+        batch, done = next_batch(requests)
+        if batch:
+            process_batch(batch)
 
 
 if __name__ == "__main__":
+    # Load the default (English) engines before reporting readiness
+    _get_analyzer()
+    _get_anonymizer()
     main()
-
@@ -1,16 +1,21 @@
-import { spawn } from 'child_process'
+import { type ChildProcessWithoutNullStreams, spawn } from 'child_process'
 import fs from 'fs'
 import path from 'path'
 import { createLogger } from '@sim/logger'
 
 const logger = createLogger('PIIValidator')
 const DEFAULT_TIMEOUT = 30000 // 30 seconds
+const STARTUP_TIMEOUT = 120000 // 2 minutes to load the Presidio engines
+const WORKER_STALL_TIMEOUT = 120000 // 2 minutes without a result while requests are in flight
+const READY_MARKER = '__SIM_READY__'
+const RESULT_PREFIX = '__SIM_RESULT__='
 
 export interface PIIValidationInput {
   text: string
   entityTypes: string[] // e.g., ["PERSON", "EMAIL_ADDRESS", "CREDIT_CARD"]
   mode: 'block' | 'mask' // block = fail if PII found, mask = return masked text
   language?: string // default: "en"
+  returnEntities?: boolean // default: true; false skips span details in block mode
   requestId: string
 }
 
@@ -37,7 +42,7 @@ export interface PIIValidationResult {
  * - mask: Passes validation and returns masked text with PII replaced
  */
 export async function validatePII(input: PIIValidationInput): Promise<PIIValidationResult> {
-  const { text, entityTypes, mode, language = 'en', requestId } = input
+  const { text, entityTypes, mode, language = 'en', returnEntities = true, requestId } = input
 
   logger.info(`[${requestId}] Starting PII validation`, {
     textLength: text.length,
@@ -48,7 +53,14 @@ export async function validatePII(input: PIIValidationInput): Promise<PIIValidat
 
   try {
     // Call Python script for PII detection
-    const result = await executePythonPIIDetection(text, entityTypes, mode, language, requestId)
+    const result = await executePythonPIIDetection(
+      text,
+      entityTypes,
+      mode,
+      language,
+      returnEntities,
+      requestId
+    )
 
     logger.info(`[${requestId}] PII validation completed`, {
       passed: result.passed,
@@ -70,117 +82,257 @@ export async function validatePII(input: PIIValidationInput): Promise<PIIValidat
   }
 }
 
+interface PIIWorker {
+  process: ChildProcessWithoutNullStreams
+  ready: Promise<void>
+  pending: Map<string, (result: PIIValidationResult) => void>
+  // IDs of requests written to the worker and not yet answered, in the order it answers them
+  inFlight: string[]
+  // When the worker last returned a result, or became busy after being idle
+  lastProgressAt: number
+}
+
+let piiWorker: PIIWorker | null = null
+let nextWorkerRequestId = 0
+
 /**
- * Execute Python PII detection script
+ * Get the shared PII detection worker, spawning a new one if none is running
+ *
+ * Presidio's engines take seconds to load, so a single long-lived Python process
+ * is reused across requests instead of spawning one per validation.
  */
-async function executePythonPIIDetection(
-  text: string,
-  entityTypes: string[],
-  mode: string,
-  language: string,
-  requestId: string
-): Promise<PIIValidationResult> {
-  return new Promise((resolve, reject) => {
-    // Use path relative to project root
-    // In Next.js, process.cwd() returns the project root
-    const guardrailsDir = path.join(process.cwd(), 'lib/guardrails')
-    const scriptPath = path.join(guardrailsDir, 'validate_pii.py')
-    const venvPython = path.join(guardrailsDir, 'venv/bin/python3')
+function getPIIWorker(): PIIWorker {
+  if (!piiWorker) {
+    piiWorker = spawnPIIWorker()
+  }
+  return piiWorker
+}
 
-    // Use venv Python if it exists, otherwise fall back to system python3
-    const pythonCmd = fs.existsSync(venvPython) ? venvPython : 'python3'
+/**
+ * Spawn the Python PII detection worker and wire up its result stream
+ */
+function spawnPIIWorker(): PIIWorker {
+  // Use path relative to project root
+  // In Next.js, process.cwd() returns the project root
+  const guardrailsDir = path.join(process.cwd(), 'lib/guardrails')
+  const scriptPath = path.join(guardrailsDir, 'validate_pii.py')
+  const venvPython = path.join(guardrailsDir, 'venv/bin/python3')
 
-    const python = spawn(pythonCmd, [scriptPath])
+  // Use venv Python if it exists, otherwise fall back to system python3
+  const pythonCmd = fs.existsSync(venvPython) ? venvPython : 'python3'
 
-    let stdout = ''
-    let stderr = ''
+  const python = spawn(pythonCmd, [scriptPath])
+  const pending = new Map<string, (result: PIIValidationResult) => void>()
 
-    const timeout = setTimeout(() => {
-      python.kill()
-      reject(new Error('PII validation timeout'))
-    }, DEFAULT_TIMEOUT)
+  let markReady: () => void = () => {}
+  let markFailed: (error: Error) => void = () => {}
+  const ready = new Promise<void>((resolve, reject) => {
+    markReady = resolve
+    markFailed = reject
+  })
+  // Avoid unhandled rejections when the worker dies with no request waiting on it
+  ready.catch(() => {})
 
-    // Write input to stdin as JSON
-    const inputData = JSON.stringify({
-      text,
-      entityTypes,
-      mode,
-      language,
-    })
-    python.stdin.write(inputData)
-    python.stdin.end()
+  const worker: PIIWorker = { process: python, ready, pending, inFlight: [], lastProgressAt: 0 }
 
-    python.stdout.on('data', (data) => {
-      stdout += data.toString()
-    })
+  // Loading the engines is bounded on its own, so it does not count against each request's timeout
+  const startupTimeout = setTimeout(() => {
+    markFailed(new Error('PII detection worker did not start in time'))
+    if (piiWorker === worker) {
+      piiWorker = null
+    }
+    python.kill()
+  }, STARTUP_TIMEOUT)
+  ready.then(
+    () => clearTimeout(startupTimeout),
+    () => clearTimeout(startupTimeout)
+  )
+
+  let stdoutBuffer = ''
+  let stdout = ''
+  let stderr = ''
 
-    python.stderr.on('data', (data) => {
-      stderr += data.toString()
+  python.stdin.on('error', (error) => {
+    logger.error('Failed to write to Python PII detection worker', {
+      error: error.message,
     })
+  })
 
-    python.on('close', (code) => {
-      clearTimeout(timeout)
+  python.stdout.setEncoding('utf8')
+  python.stderr.setEncoding('utf8')
 
-      if (code !== 0) {
-        logger.error(`[${requestId}] Python PII detection failed`, {
-          code,
-          stderr,
-        })
-        resolve({
-          passed: false,
-          error: stderr || 'PII detection failed',
-          detectedEntities: [],
+  python.stdout.on('data', (data: string) => {
+    stdoutBuffer += data
+
+    let newlineIndex = stdoutBuffer.indexOf('\n')
+    while (newlineIndex !== -1) {
+      const line = stdoutBuffer.slice(0, newlineIndex)
+      stdoutBuffer = stdoutBuffer.slice(newlineIndex + 1)
+      handleWorkerLine(line)
+      newlineIndex = stdoutBuffer.indexOf('\n')
+    }
+  })
+
+  python.stderr.on('data', (data: string) => {
+    // Only keep the tail so a long-lived worker cannot grow this unbounded
+    stderr = (stderr + data).slice(-4000)
+  })
+
+  function handleWorkerLine(line: string) {
+    if (line === READY_MARKER) {
+      markReady()
+      return
+    }
+
+    if (!line.startsWith(RESULT_PREFIX)) {
+      stdout = (stdout + line).slice(-4000)
+      return
+    }
+
+    try {
+      const { id, result } = JSON.parse(line.slice(RESULT_PREFIX.length))
+      worker.lastProgressAt = Date.now()
+
+      // The worker answers requests in the order they were written, so a result it could
+      // not tag with an ID (its request failed to decode) belongs to the oldest one in flight
+      const expectedId = worker.inFlight.shift()
+      const requestId = id ?? expectedId
+      if (id == null) {
+        logger.error('Python PII detection worker returned an untagged result', {
+          requestId: expectedId,
+          error: result?.error,
         })
+      }
+
+      const settle = requestId === undefined ? undefined : pending.get(requestId)
+      if (!settle) {
+        // The request already timed out
+        logger.warn('Dropping PII result with no pending request', { id: requestId })
         return
       }
+      pending.delete(requestId)
+      settle(
+        id == null
+          ? {
+              passed: false,
+              error: result?.error || 'PII detection worker returned an untagged result',
+              detectedEntities: [],
+            }
+          : result
+      )
+    } catch (error: any) {
+      logger.error('Failed to parse Python result', {
+        error: error.message,
+        line: line.substring(0, 200),
+      })
+    }
+  }
+
+  python.on('close', (code) => {
+    if (piiWorker === worker) {
+      piiWorker = null
+    }
 
-      // Parse result from stdout
-      try {
-        const prefix = '__SIM_RESULT__='
-        const lines = stdout.split('\n')
-        const marker = lines.find((l) => l.startsWith(prefix))
+    logger.error('Python PII detection worker exited', { code, stderr })
 
-        if (marker) {
-          const jsonPart = marker.slice(prefix.length)
-          const result = JSON.parse(jsonPart)
+    const error = stderr || stdout || `PII detection worker exited with code ${code}`
+    markFailed(new Error(error))
+
+    for (const settle of pending.values()) {
+      settle({
+        passed: false,
+        error,
+        detectedEntities: [],
+      })
+    }
+    pending.clear()
+    worker.inFlight.length = 0
+  })
+
+  python.on('error', (error) => {
+    if (piiWorker === worker) {
+      piiWorker = null
+    }
+
+    logger.error('Failed to spawn Python process', {
+      error: error.message,
+    })
+    markFailed(
+      new Error(
+        `Failed to execute Python: ${error.message}. Make sure Python 3 and Presidio are installed.`
+      )
+    )
+  })
+
+  return worker
+}
+
+/**
+ * Execute PII detection on the shared Python worker
+ */
+async function executePythonPIIDetection(
+  text: string,
+  entityTypes: string[],
+  mode: string,
+  language: string,
+  returnEntities: boolean,
+  requestId: string
+): Promise<PIIValidationResult> {
+  const worker = getPIIWorker()
+  const id = String(nextWorkerRequestId++)
+
+  return new Promise((resolve, reject) => {
+    let timeout: ReturnType<typeof setTimeout> | undefined
+
+    worker.ready
+      .then(() => {
+        worker.pending.set(id, (result) => {
+          clearTimeout(timeout)
           resolve(result)
-        } else {
-          logger.error(`[${requestId}] No result marker found`, {
-            stdout,
-            stderr,
-            stdoutLines: lines,
-          })
-          resolve({
-            passed: false,
-            error: `No result marker found in output. stdout: ${stdout.substring(0, 200)}, stderr: ${stderr.substring(0, 200)}`,
-            detectedEntities: [],
-          })
+        })
+
+        // Write input to stdin as JSON framed by a 4-byte big-endian length prefix
+        const payload = Buffer.from(
+          JSON.stringify({
+            id,
+            text,
+            entityTypes,
+            mode,
+            language,
+            returnEntities,
+          }),
+          'utf8'
+        )
+        const header = Buffer.allocUnsafe(4)
+        header.writeUInt32BE(payload.length, 0)
+        worker.process.stdin.write(Buffer.concat([header, payload]))
+        if (worker.inFlight.length === 0) {
+          worker.lastProgressAt = Date.now()
         }
-      } catch (error: any) {
-        logger.error(`[${requestId}] Failed to parse Python result`, {
+        worker.inFlight.push(id)
+
+        // Time out only this request; its late result is dropped when it arrives. The worker
+        // is replaced only once it has stopped answering altogether, since a stuck worker
+        // would otherwise block every request queued behind it
+        timeout = setTimeout(() => {
+          worker.pending.delete(id)
+          if (Date.now() - worker.lastProgressAt >= WORKER_STALL_TIMEOUT) {
+            logger.error(`[${requestId}] Python PII detection worker stalled, restarting it`)
+            // Detach it now so requests arriving before it exits get a fresh worker
+            if (piiWorker === worker) {
+              piiWorker = null
+            }
+            worker.process.kill()
+          }
+          reject(new Error('PII validation timeout'))
+        }, DEFAULT_TIMEOUT)
+      })
+      .catch((error: Error) => {
+        logger.error(`[${requestId}] Python PII detection worker unavailable`, {
           error: error.message,
-          stdout,
-          stderr,
         })
-        resolve({
-          passed: false,
-          error: `Failed to parse result: ${error.message}. stdout: ${stdout.substring(0, 200)}`,
-          detectedEntities: [],
-        })
-      }
-    })
-
-    python.on('error', (error) => {
-      clearTimeout(timeout)
-      logger.error(`[${requestId}] Failed to spawn Python process`, {
-        error: error.message,
+        reject(error)
       })
-      reject(
-        new Error(
-          `Failed to execute Python: ${error.message}. Make sure Python 3 and Presidio are installed.`
-        )
-      )
-    })
   })
 }
 
@@ -27,19 +27,30 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=[
-        "requests>=2.25.0",
+        "requests>=2.27.0",
         "typing-extensions>=4.0.0; python_version<'3.10'",
     ],
     extras_require={
+        "async": [
+            "httpx>=0.23.0",
+        ],
+        "speedups": [
+            "orjson>=3.8.0",
+        ],
         "dev": [
             "pytest>=6.0.0",
             "pytest-asyncio>=0.18.0",
             "black>=22.0.0",
             "flake8>=4.0.0",
             "mypy>=0.910",
+            "httpx>=0.23.0",
+            "responses>=0.17.0",
+            "pytest-xdist>=2.0.0",
         ],
         "test": [
             "pytest>=6.0.0",
+            "responses>=0.17.0",
+            "pytest-xdist>=2.0.0",
         ],
     },
     keywords=["simstudio", "ai", "workflow", "sdk", "api", "automation"],
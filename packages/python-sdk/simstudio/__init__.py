@@ -4,18 +4,36 @@ Sim SDK for Python
 Official Python SDK for Sim, allowing you to execute workflows programmatically.
 """
 
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
+import asyncio
+import io
 import time
 import random
 import os
+import json
+from urllib.parse import quote
 
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:
+    # Only needed by AsyncSimStudioClient (pip install simstudio-sdk[async])
+    httpx = None
+
+try:
+    import orjson
+except ImportError:
+    # Faster JSON encoding and decoding when installed (pip install simstudio-sdk[speedups])
+    orjson = None
 
 
 __version__ = "0.1.2"
 __all__ = [
     "SimStudioClient",
+    "AsyncSimStudioClient",
     "SimStudioError",
     "WorkflowExecutionResult",
     "WorkflowStatus",
@@ -25,6 +43,46 @@ __all__ = [
 ]
 
 
+# Read size when base64-encoding files; a multiple of 3 so each chunk encodes without padding
+_BASE64_CHUNK_SIZE = 57 * 1024
+
+# Read size when streaming file parts of a multipart upload
+_UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Connections kept open per host, so concurrent threads sharing a client reuse
+# connections instead of exceeding urllib3's default pool of 10
+_POOL_SIZE = 64
+
+
+def _json_dumps(value: Any) -> bytes:
+    """Encode a request body as JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except orjson.JSONEncodeError:
+            # e.g. lone surrogates or non-string keys, which json handles
+            pass
+    return json.dumps(value).encode('utf-8')
+
+
+def _json_loads(content: bytes) -> Any:
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # e.g. UTF-16 bodies or lone surrogates, which json handles
+            pass
+    # Raise what response.json() does: requests' JSONDecodeError is also a RequestException,
+    # so a non-JSON body (e.g. a proxy's HTML error page) surfaces as a SimStudioError
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError as e:
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+    except UnicodeDecodeError as e:
+        raise requests.exceptions.JSONDecodeError(e.reason, '', e.start) from e
+
+
 @dataclass
 class WorkflowExecutionResult:
     """Result of a workflow execution."""
@@ -81,25 +139,170 @@ class SimStudioError(Exception):
         self.status = status
 
 
-class SimStudioClient:
+class _MultipartStream:
     """
-    Sim API client for executing workflows programmatically.
-    
-    Args:
-        api_key: Your Sim API key
-        base_url: Base URL for the Sim API (defaults to https://sim.ai)
+    A multipart/form-data request body that reads file parts in chunks while it is sent.
+
+    requests builds multipart bodies in memory, reading every file in full; passing this
+    iterable as data instead keeps memory flat for large uploads. Content-Length is set
+    when every file's size is known, otherwise requests falls back to chunked encoding.
+    AsyncSimStudioClient sends the same body through aiter_chunks, as httpx's own files=
+    support sizes files with fstat, which is wrong for wrappers such as gzip files.
     """
-    
-    def __init__(self, api_key: str, base_url: str = "https://sim.ai"):
-        self.api_key = api_key
-        self.base_url = base_url.rstrip('/')
-        self._session = requests.Session()
-        self._session.headers.update({
-            'X-API-Key': self.api_key,
-            'Content-Type': 'application/json',
-        })
-        self._rate_limit_info: Optional[RateLimitInfo] = None
-    
+
+    def __init__(
+        self,
+        fields: Dict[str, str],
+        files: List[Tuple[str, Tuple[str, Any, str]]]
+    ):
+        boundary = os.urandom(16).hex()
+        self.content_type = f'multipart/form-data; boundary={boundary}'
+        self._parts: List[Tuple[bytes, Any, Optional[int]]] = []
+        self._closing = f'--{boundary}--\r\n'.encode()
+
+        for name, value in fields.items():
+            header = self._part_header(boundary, f'name="{self._escape(name)}"')
+            self._parts.append((header + value.encode() + b'\r\n', None, None))
+
+        for name, (filename, file, content_type) in files:
+            header = self._part_header(
+                boundary,
+                f'name="{self._escape(name)}"; filename="{self._escape(filename)}"',
+                content_type
+            )
+            self._parts.append((header, file, self._tell(file)))
+
+        self.len = self._content_length()
+
+    @staticmethod
+    def _escape(value: Any) -> str:
+        """Escape a parameter value for a Content-Disposition header."""
+        return str(value).replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
+
+    @staticmethod
+    def _part_header(boundary: str, disposition: str, content_type: Optional[str] = None) -> bytes:
+        """Build the boundary line and headers that open a part."""
+        header = f'--{boundary}\r\nContent-Disposition: form-data; {disposition}\r\n'
+        if content_type:
+            header += f'Content-Type: {content_type}\r\n'
+        return (header + '\r\n').encode()
+
+    @staticmethod
+    def _tell(file: Any) -> Optional[int]:
+        """Current position of a seekable file, or None."""
+        try:
+            return file.tell()
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    def _content_length(self) -> Optional[int]:
+        """Total body size, or None if any file's remaining size is unknown."""
+        length = len(self._closing)
+        for header, file, start in self._parts:
+            length += len(header)
+            if file is None:
+                continue
+            # Text files are encoded while streaming, so their byte size is not known up front
+            if start is None or isinstance(file, io.TextIOBase):
+                return None
+            # Seek rather than fstat: for wrappers such as gzip files, fileno() is the underlying
+            # file's, not the bytes read() returns; ones that cannot seek to the end are chunked
+            try:
+                size = file.seek(0, os.SEEK_END)
+                file.seek(start)
+            except (AttributeError, OSError, ValueError):
+                return None
+            length += max(size - start, 0) + 2
+        return length
+
+    def __iter__(self):
+        for header, file, start in self._parts:
+            yield header
+            if file is None:
+                continue
+            # Start from the recorded position, so a resent body (e.g. on redirect) is complete
+            if start is not None:
+                file.seek(start)
+            while True:
+                chunk = file.read(_UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk.encode() if isinstance(chunk, str) else chunk
+            # Leave the file where the caller had it, so retries can upload it again
+            if start is not None:
+                file.seek(start)
+            yield b'\r\n'
+        yield self._closing
+
+    async def aiter_chunks(self):
+        """The same body as an async iterator, which httpx's AsyncClient requires."""
+        for chunk in self:
+            yield chunk
+
+
+class _BaseSimStudioClient:
+    """Request building and response parsing shared by the sync and async clients."""
+
+    base_url: str
+    use_multipart: bool
+    _rate_limit_info: Optional[RateLimitInfo]
+    _last_rl_key: Optional[tuple]
+
+    @staticmethod
+    def _is_file_like(value: Any) -> bool:
+        """Check whether a value is a file-like object."""
+        return hasattr(value, 'read') and callable(value.read)
+
+    @staticmethod
+    def _get_file_metadata(value: Any) -> Tuple[str, str]:
+        """Get the filename and content type of a file-like object."""
+        filename = getattr(value, 'name', 'file')
+        if isinstance(filename, str):
+            filename = os.path.basename(filename)
+
+        content_type = getattr(value, 'content_type', 'application/octet-stream')
+        return filename, content_type
+
+    def _has_file_like(self, value: Any) -> bool:
+        """
+        Check whether input contains any file objects.
+        Recursively checks nested dicts and lists, stopping at the first file found.
+        """
+        if self._is_file_like(value):
+            return True
+
+        if isinstance(value, list):
+            return any(self._has_file_like(item) for item in value)
+
+        if isinstance(value, dict):
+            return any(self._has_file_like(v) for v in value.values())
+
+        return False
+
+    def _extract_files(
+        self,
+        value: Any,
+        files: List[Tuple[List[Union[str, int]], Any]],
+        path: Optional[List[Union[str, int]]] = None
+    ) -> Any:
+        """
+        Replace file objects in input with None, collecting (path, file) pairs.
+        Recursively processes nested dicts and lists. Files are not read here.
+        """
+        path = path or []
+
+        if self._is_file_like(value):
+            files.append((path, value))
+            return None
+
+        if isinstance(value, list):
+            return [self._extract_files(item, files, path + [i]) for i, item in enumerate(value)]
+
+        if isinstance(value, dict):
+            return {k: self._extract_files(v, files, path + [k]) for k, v in value.items()}
+
+        return value
+
     def _convert_files_to_base64(self, value: Any) -> Any:
         """
         Convert file objects in input to API format (base64).
@@ -108,26 +311,32 @@ class SimStudioClient:
         import base64
 
         # Check if this is a file-like object
-        if hasattr(value, 'read') and callable(value.read):
+        if self._is_file_like(value):
             # Save current position if seekable
             initial_pos = value.tell() if hasattr(value, 'tell') else None
 
-            # Read file bytes
-            file_bytes = value.read()
+            # Encode to base64 chunk by chunk so the raw file is never held in memory.
+            # Bytes are only encoded in multiples of 3 so no padding lands mid-stream,
+            # even when read() returns short chunks.
+            encoded = bytearray()
+            remainder = b''
+            while True:
+                chunk = value.read(_BASE64_CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunk = remainder + chunk
+                aligned = len(chunk) - len(chunk) % 3
+                encoded += base64.b64encode(chunk[:aligned])
+                remainder = chunk[aligned:]
+            encoded += base64.b64encode(remainder)
+            base64_data = encoded.decode('ascii')
 
             # Restore position if seekable
             if initial_pos is not None and hasattr(value, 'seek'):
                 value.seek(initial_pos)
 
-            # Encode to base64
-            base64_data = base64.b64encode(file_bytes).decode('utf-8')
-
             # Get file metadata
-            filename = getattr(value, 'name', 'file')
-            if isinstance(filename, str):
-                filename = os.path.basename(filename)
-
-            content_type = getattr(value, 'content_type', 'application/octet-stream')
+            filename, content_type = self._get_file_metadata(value)
 
             return {
                 'type': 'file',
@@ -146,6 +355,190 @@ class SimStudioClient:
 
         return value
 
+    def _build_execute_body(
+        self,
+        input: Optional[Any],
+        stream: Optional[bool],
+        selected_outputs: Optional[list]
+    ) -> Tuple[Dict[str, Any], List[Tuple[str, Tuple[str, Any, str]]]]:
+        """
+        Build the request body for a workflow execution.
+
+        Returns:
+            A (body, files) tuple. When files is empty the body is sent as JSON. Otherwise
+            the body holds JSON-encoded form fields and files holds the multipart file parts.
+        """
+        # Build JSON body - spread dict inputs at root level, wrap primitives/lists in 'input' field
+        body = {}
+        if input is not None:
+            if isinstance(input, dict):
+                # Dict input: spread at root level (matches curl/API behavior)
+                body = input
+            else:
+                # Primitive or list input: wrap in 'input' field
+                body = {'input': input}
+
+        # Only rebuild the body when it contains files; both rewrites return new containers
+        files: List[Tuple[List[Union[str, int]], Any]] = []
+        if self._has_file_like(body):
+            if self.use_multipart:
+                # Pull file objects out of the input so they can be sent as multipart parts
+                body = self._extract_files(body, files)
+            else:
+                # Convert any file objects in the input to base64 format
+                body = self._convert_files_to_base64(body)
+        elif body is input and (stream is not None or selected_outputs is not None):
+            # Copy before adding control fields so the caller's dict is not mutated
+            body = dict(body)
+
+        if stream is not None:
+            body['stream'] = stream
+        if selected_outputs is not None:
+            body['selectedOutputs'] = selected_outputs
+
+        if not files:
+            return body, []
+
+        # Top-level fields are sent as JSON strings; each file part is named with the
+        # percent-encoded JSON path of the input value it replaces
+        fields = {key: json.dumps(value) for key, value in body.items()}
+        multipart_files = []
+        for path, file in files:
+            filename, content_type = self._get_file_metadata(file)
+            multipart_files.append((quote(json.dumps(path), safe=''), (filename, file, content_type)))
+        return fields, multipart_files
+
+    def _rate_limit_error(self) -> SimStudioError:
+        """Build the error raised for a 429 response."""
+        retry_after = self._rate_limit_info.retry_after if self._rate_limit_info else 1000
+        return SimStudioError(
+            f'Rate limit exceeded. Retry after {retry_after}ms',
+            'RATE_LIMIT_EXCEEDED',
+            429
+        )
+
+    @staticmethod
+    def _backoff_schedule(
+        max_retries: int,
+        initial_delay: float,
+        max_delay: float,
+        backoff_multiplier: float
+    ) -> List[float]:
+        """Compute the exponential backoff delay before each retry, capped at max_delay."""
+        schedule = []
+        delay = min(initial_delay, max_delay)
+        for _ in range(max_retries):
+            schedule.append(delay)
+            delay = min(delay * backoff_multiplier, max_delay)
+        return schedule
+
+    def _retry_wait(self, delay: float) -> float:
+        """Seconds to wait before a retry: the server's retry-after, or the backoff delay with ±25% jitter."""
+        if self._rate_limit_info and self._rate_limit_info.retry_after:
+            return self._rate_limit_info.retry_after / 1000
+        return delay * random.uniform(0.75, 1.25)
+
+    @staticmethod
+    def _parse_execution_result(
+        status_code: int,
+        result_data: Dict[str, Any]
+    ) -> Union[WorkflowExecutionResult, AsyncExecutionResult]:
+        """Build the result object for a successful execute response."""
+        # Check if this is an async execution response (202 status)
+        if status_code == 202 and 'taskId' in result_data:
+            return AsyncExecutionResult(
+                success=result_data.get('success', True),
+                task_id=result_data['taskId'],
+                status=result_data.get('status', 'queued'),
+                created_at=result_data.get('createdAt', ''),
+                links=result_data.get('links', {})
+            )
+
+        return WorkflowExecutionResult(
+            success=result_data['success'],
+            output=result_data.get('output'),
+            error=result_data.get('error'),
+            logs=result_data.get('logs'),
+            metadata=result_data.get('metadata'),
+            trace_spans=result_data.get('traceSpans'),
+            total_duration=result_data.get('totalDuration')
+        )
+
+    def set_base_url(self, base_url: str) -> None:
+        """
+        Update the base URL.
+        
+        Args:
+            base_url: New base URL
+        """
+        self.base_url = base_url.rstrip('/')
+
+    def get_rate_limit_info(self) -> Optional[RateLimitInfo]:
+        """
+        Get current rate limit information.
+
+        Returns:
+            RateLimitInfo object or None if no rate limit info available
+        """
+        return self._rate_limit_info
+
+    def _update_rate_limit_info(self, response: Any) -> None:
+        """
+        Update rate limit info from response headers.
+
+        Args:
+            response: The requests or httpx response to extract headers from
+        """
+        headers = response.headers
+        key = (
+            headers.get('x-ratelimit-limit'),
+            headers.get('x-ratelimit-remaining'),
+            headers.get('x-ratelimit-reset'),
+            headers.get('retry-after'),
+        )
+        # Polling loops usually see the same headers repeatedly; keep the existing info
+        if key == self._last_rl_key:
+            return
+        limit, remaining, reset, retry_after = key
+
+        if limit or remaining or reset:
+            self._rate_limit_info = RateLimitInfo(
+                limit=int(limit) if limit else 0,
+                remaining=int(remaining) if remaining else 0,
+                reset=int(reset) if reset else 0,
+                retry_after=int(retry_after) * 1000 if retry_after else None
+            )
+        self._last_rl_key = key
+
+
+class SimStudioClient(_BaseSimStudioClient):
+    """
+    Sim API client for executing workflows programmatically.
+    
+    Args:
+        api_key: Your Sim API key
+        base_url: Base URL for the Sim API (defaults to https://sim.ai)
+        use_multipart: Upload file inputs as multipart/form-data (defaults to False, which
+                       sends them base64-encoded inside the JSON body). Only enable this for
+                       servers that accept multipart execute requests; older ones ignore the
+                       body and run the workflow without input.
+    """
+    
+    def __init__(self, api_key: str, base_url: str = "https://sim.ai", use_multipart: bool = False):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.use_multipart = use_multipart
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=_POOL_SIZE, pool_maxsize=_POOL_SIZE)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+        self._session.headers.update({
+            'X-API-Key': self.api_key,
+            'Content-Type': 'application/json',
+        })
+        self._rate_limit_info: Optional[RateLimitInfo] = None
+        self._last_rl_key: Optional[tuple] = None
+    
     def execute_workflow(
         self,
         workflow_id: str,
@@ -160,13 +553,14 @@ class SimStudioClient:
         Execute a workflow with optional input data.
         If async_execution is True, returns immediately with a task ID.
 
-        File objects in input will be automatically detected and converted to base64.
+        File objects in input will be automatically detected and converted to base64
+        (or uploaded as multipart/form-data when use_multipart is True).
 
         Args:
             workflow_id: The ID of the workflow to execute
             input: Input data to pass to the workflow. Can be a dict (spread at root level),
                    primitive value (string, number, bool), or list (wrapped in 'input' field).
-                   File-like objects within dicts are automatically converted to base64.
+                   File-like objects within dicts and lists are uploaded automatically.
             timeout: Timeout in seconds (default: 30.0)
             stream: Enable streaming responses (default: None)
             selected_outputs: Block outputs to stream (e.g., ["agent1.content"])
@@ -180,52 +574,40 @@ class SimStudioClient:
         """
         url = f"{self.base_url}/api/workflows/{workflow_id}/execute"
 
-        # Build headers - async execution uses X-Execution-Mode header
-        headers = self._session.headers.copy()
-        if async_execution:
-            headers['X-Execution-Mode'] = 'async'
+        # Extra headers, merged over the session's by requests - async execution uses X-Execution-Mode
+        headers = {'X-Execution-Mode': 'async'} if async_execution else None
 
         try:
-            # Build JSON body - spread dict inputs at root level, wrap primitives/lists in 'input' field
-            body = {}
-            if input is not None:
-                if isinstance(input, dict):
-                    # Dict input: spread at root level (matches curl/API behavior)
-                    body = input.copy()
-                else:
-                    # Primitive or list input: wrap in 'input' field
-                    body = {'input': input}
-
-            # Convert any file objects in the input to base64 format
-            body = self._convert_files_to_base64(body)
-
-            if stream is not None:
-                body['stream'] = stream
-            if selected_outputs is not None:
-                body['selectedOutputs'] = selected_outputs
-
-            response = self._session.post(
-                url,
-                json=body,
-                headers=headers,
-                timeout=timeout
-            )
+            body, files = self._build_execute_body(input, stream, selected_outputs)
+
+            if files:
+                # Stream the multipart body rather than letting requests read each file into memory
+                multipart = _MultipartStream(body, files)
+                headers = {**(headers or {}), 'Content-Type': multipart.content_type}
+                response = self._session.post(
+                    url,
+                    data=multipart,
+                    headers=headers,
+                    timeout=timeout
+                )
+            else:
+                response = self._session.post(
+                    url,
+                    data=_json_dumps(body),
+                    headers=headers,
+                    timeout=timeout
+                )
 
             # Update rate limit info
             self._update_rate_limit_info(response)
 
             # Handle rate limiting
             if response.status_code == 429:
-                retry_after = self._rate_limit_info.retry_after if self._rate_limit_info else 1000
-                raise SimStudioError(
-                    f'Rate limit exceeded. Retry after {retry_after}ms',
-                    'RATE_LIMIT_EXCEEDED',
-                    429
-                )
+                raise self._rate_limit_error()
 
             if not response.ok:
                 try:
-                    error_data = response.json()
+                    error_data = _json_loads(response.content)
                     error_message = error_data.get('error', f'HTTP {response.status_code}: {response.reason}')
                     error_code = error_data.get('code')
                 except (ValueError, KeyError):
@@ -234,27 +616,7 @@ class SimStudioClient:
 
                 raise SimStudioError(error_message, error_code, response.status_code)
 
-            result_data = response.json()
-
-            # Check if this is an async execution response (202 status)
-            if response.status_code == 202 and 'taskId' in result_data:
-                return AsyncExecutionResult(
-                    success=result_data.get('success', True),
-                    task_id=result_data['taskId'],
-                    status=result_data.get('status', 'queued'),
-                    created_at=result_data.get('createdAt', ''),
-                    links=result_data.get('links', {})
-                )
-
-            return WorkflowExecutionResult(
-                success=result_data['success'],
-                output=result_data.get('output'),
-                error=result_data.get('error'),
-                logs=result_data.get('logs'),
-                metadata=result_data.get('metadata'),
-                trace_spans=result_data.get('traceSpans'),
-                total_duration=result_data.get('totalDuration')
-            )
+            return self._parse_execution_result(response.status_code, _json_loads(response.content))
 
         except requests.Timeout:
             raise SimStudioError(f'Workflow execution timed out after {timeout} seconds', 'TIMEOUT')
@@ -281,7 +643,7 @@ class SimStudioClient:
             
             if not response.ok:
                 try:
-                    error_data = response.json()
+                    error_data = _json_loads(response.content)
                     error_message = error_data.get('error', f'HTTP {response.status_code}: {response.reason}')
                     error_code = error_data.get('code')
                 except (ValueError, KeyError):
@@ -290,7 +652,7 @@ class SimStudioClient:
                 
                 raise SimStudioError(error_message, error_code, response.status_code)
             
-            status_data = response.json()
+            status_data = _json_loads(response.content)
             
             return WorkflowStatus(
                 is_deployed=status_data.get('isDeployed', False),
@@ -361,15 +723,6 @@ class SimStudioClient:
         self.api_key = api_key
         self._session.headers.update({'X-API-Key': api_key})
     
-    def set_base_url(self, base_url: str) -> None:
-        """
-        Update the base URL.
-        
-        Args:
-            base_url: New base URL
-        """
-        self.base_url = base_url.rstrip('/')
-    
     def close(self) -> None:
         """Close the underlying HTTP session."""
         self._session.close()
@@ -396,7 +749,7 @@ class SimStudioClient:
 
             if not response.ok:
                 try:
-                    error_data = response.json()
+                    error_data = _json_loads(response.content)
                     error_message = error_data.get('error', f'HTTP {response.status_code}: {response.reason}')
                     error_code = error_data.get('code')
                 except (ValueError, KeyError):
@@ -405,7 +758,7 @@ class SimStudioClient:
 
                 raise SimStudioError(error_message, error_code, response.status_code)
 
-            return response.json()
+            return _json_loads(response.content)
 
         except requests.RequestException as e:
             raise SimStudioError(f'Failed to get job status: {str(e)}', 'STATUS_ERROR')
@@ -446,7 +799,7 @@ class SimStudioClient:
             SimStudioError: If max retries exceeded or other error occurs
         """
         last_error = None
-        delay = initial_delay
+        schedule = self._backoff_schedule(max_retries, initial_delay, max_delay, backoff_multiplier)
 
         for attempt in range(max_retries + 1):
             try:
@@ -468,52 +821,10 @@ class SimStudioClient:
                 if attempt == max_retries:
                     break
 
-                # Use retry-after if provided, otherwise use exponential backoff
-                wait_time = (
-                    self._rate_limit_info.retry_after / 1000
-                    if self._rate_limit_info and self._rate_limit_info.retry_after
-                    else min(delay, max_delay)
-                )
-
-                # Add jitter (±25%)
-                jitter = wait_time * (0.75 + random.random() * 0.5)
-
-                time.sleep(jitter)
-
-                # Exponential backoff for next attempt
-                delay *= backoff_multiplier
+                time.sleep(self._retry_wait(schedule[attempt]))
 
         raise last_error or SimStudioError('Max retries exceeded', 'MAX_RETRIES_EXCEEDED')
 
-    def get_rate_limit_info(self) -> Optional[RateLimitInfo]:
-        """
-        Get current rate limit information.
-
-        Returns:
-            RateLimitInfo object or None if no rate limit info available
-        """
-        return self._rate_limit_info
-
-    def _update_rate_limit_info(self, response: requests.Response) -> None:
-        """
-        Update rate limit info from response headers.
-
-        Args:
-            response: The response object to extract headers from
-        """
-        limit = response.headers.get('x-ratelimit-limit')
-        remaining = response.headers.get('x-ratelimit-remaining')
-        reset = response.headers.get('x-ratelimit-reset')
-        retry_after = response.headers.get('retry-after')
-
-        if limit or remaining or reset:
-            self._rate_limit_info = RateLimitInfo(
-                limit=int(limit) if limit else 0,
-                remaining=int(remaining) if remaining else 0,
-                reset=int(reset) if reset else 0,
-                retry_after=int(retry_after) * 1000 if retry_after else None
-            )
-
     def get_usage_limits(self) -> UsageLimits:
         """
         Get current usage limits and quota information.
@@ -533,7 +844,7 @@ class SimStudioClient:
 
             if not response.ok:
                 try:
-                    error_data = response.json()
+                    error_data = _json_loads(response.content)
                     error_message = error_data.get('error', f'HTTP {response.status_code}: {response.reason}')
                     error_code = error_data.get('code')
                 except (ValueError, KeyError):
@@ -542,7 +853,7 @@ class SimStudioClient:
 
                 raise SimStudioError(error_message, error_code, response.status_code)
 
-            data = response.json()
+            data = _json_loads(response.content)
 
             return UsageLimits(
                 success=data.get('success', True),
@@ -562,5 +873,341 @@ class SimStudioClient:
         self.close()
 
 
+class AsyncSimStudioClient(_BaseSimStudioClient):
+    """
+    Asynchronous Sim API client, built on httpx.
+
+    Mirrors SimStudioClient with coroutine methods, so many workflows can be
+    executed concurrently (e.g. with asyncio.gather) over one connection pool.
+    Requires the optional httpx dependency: pip install simstudio-sdk[async]
+
+    Args:
+        api_key: Your Sim API key
+        base_url: Base URL for the Sim API (defaults to https://sim.ai)
+        use_multipart: Upload file inputs as multipart/form-data (defaults to False, which
+                       sends them base64-encoded inside the JSON body). Only enable this for
+                       servers that accept multipart execute requests; older ones ignore the
+                       body and run the workflow without input.
+    """
+
+    def __init__(self, api_key: str, base_url: str = "https://sim.ai", use_multipart: bool = False):
+        if httpx is None:
+            raise ImportError(
+                "AsyncSimStudioClient requires httpx. Install it with: pip install simstudio-sdk[async]"
+            )
+
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.use_multipart = use_multipart
+        # No default timeout, like SimStudioClient's session; execute_workflow passes its own
+        self._client = httpx.AsyncClient(
+            headers={'X-API-Key': self.api_key},
+            limits=httpx.Limits(max_connections=_POOL_SIZE, max_keepalive_connections=_POOL_SIZE),
+            timeout=None,
+        )
+        self._rate_limit_info: Optional[RateLimitInfo] = None
+        self._last_rl_key: Optional[tuple] = None
+
+    @staticmethod
+    def _raise_for_error(response: Any) -> None:
+        """Raise a SimStudioError for an unsuccessful httpx response."""
+        if response.is_success:
+            return
+
+        try:
+            error_data = _json_loads(response.content)
+            error_message = error_data.get('error', f'HTTP {response.status_code}: {response.reason_phrase}')
+            error_code = error_data.get('code')
+        except (ValueError, KeyError):
+            error_message = f'HTTP {response.status_code}: {response.reason_phrase}'
+            error_code = None
+
+        raise SimStudioError(error_message, error_code, response.status_code)
+
+    async def execute_workflow(
+        self,
+        workflow_id: str,
+        input: Optional[Any] = None,
+        *,
+        timeout: float = 30.0,
+        stream: Optional[bool] = None,
+        selected_outputs: Optional[list] = None,
+        async_execution: Optional[bool] = None
+    ) -> Union[WorkflowExecutionResult, AsyncExecutionResult]:
+        """
+        Execute a workflow with optional input data.
+        If async_execution is True, returns immediately with a task ID.
+
+        Args:
+            workflow_id: The ID of the workflow to execute
+            input: Input data to pass to the workflow (can include file-like objects)
+            timeout: Timeout in seconds (default: 30.0)
+            stream: Enable streaming responses (default: None)
+            selected_outputs: Block outputs to stream (e.g., ["agent1.content"])
+            async_execution: Execute asynchronously (default: None)
+
+        Returns:
+            WorkflowExecutionResult or AsyncExecutionResult object
+
+        Raises:
+            SimStudioError: If the workflow execution fails
+        """
+        url = f"{self.base_url}/api/workflows/{workflow_id}/execute"
+        headers = {'X-Execution-Mode': 'async'} if async_execution else None
+
+        try:
+            body, files = self._build_execute_body(input, stream, selected_outputs)
+
+            if files:
+                multipart = _MultipartStream(body, files)
+                headers = {**(headers or {}), 'Content-Type': multipart.content_type}
+                # Without Content-Length httpx sends the stream chunked
+                if multipart.len is not None:
+                    headers['Content-Length'] = str(multipart.len)
+                response = await self._client.post(
+                    url,
+                    content=multipart.aiter_chunks(),
+                    headers=headers,
+                    timeout=timeout
+                )
+            else:
+                response = await self._client.post(
+                    url,
+                    content=_json_dumps(body),
+                    headers={**(headers or {}), 'Content-Type': 'application/json'},
+                    timeout=timeout
+                )
+
+            self._update_rate_limit_info(response)
+
+            if response.status_code == 429:
+                raise self._rate_limit_error()
+
+            self._raise_for_error(response)
+
+            return self._parse_execution_result(response.status_code, _json_loads(response.content))
+
+        except httpx.TimeoutException:
+            raise SimStudioError(f'Workflow execution timed out after {timeout} seconds', 'TIMEOUT')
+        except (httpx.HTTPError, ValueError) as e:
+            raise SimStudioError(f'Failed to execute workflow: {str(e)}', 'EXECUTION_ERROR')
+
+    async def get_workflow_status(self, workflow_id: str) -> WorkflowStatus:
+        """
+        Get the status of a workflow (deployment status, etc.).
+
+        Args:
+            workflow_id: The ID of the workflow
+
+        Returns:
+            WorkflowStatus object containing the workflow status
+
+        Raises:
+            SimStudioError: If getting the status fails
+        """
+        url = f"{self.base_url}/api/workflows/{workflow_id}/status"
+
+        try:
+            response = await self._client.get(url)
+            self._raise_for_error(response)
+            status_data = _json_loads(response.content)
+
+            return WorkflowStatus(
+                is_deployed=status_data.get('isDeployed', False),
+                deployed_at=status_data.get('deployedAt'),
+                needs_redeployment=status_data.get('needsRedeployment', False)
+            )
+
+        except (httpx.HTTPError, ValueError) as e:
+            raise SimStudioError(f'Failed to get workflow status: {str(e)}', 'STATUS_ERROR')
+
+    async def validate_workflow(self, workflow_id: str) -> bool:
+        """
+        Validate that a workflow is ready for execution.
+
+        Args:
+            workflow_id: The ID of the workflow
+
+        Returns:
+            True if the workflow is deployed and ready, False otherwise
+        """
+        try:
+            status = await self.get_workflow_status(workflow_id)
+            return status.is_deployed
+        except SimStudioError:
+            return False
+
+    async def execute_workflow_sync(
+        self,
+        workflow_id: str,
+        input: Optional[Any] = None,
+        *,
+        timeout: float = 30.0,
+        stream: Optional[bool] = None,
+        selected_outputs: Optional[list] = None
+    ) -> WorkflowExecutionResult:
+        """
+        Execute a workflow and wait for its result (ensures non-async mode).
+
+        Args:
+            workflow_id: The ID of the workflow to execute
+            input: Input data to pass to the workflow (can include file-like objects)
+            timeout: Timeout for the initial request in seconds
+            stream: Enable streaming responses (default: None)
+            selected_outputs: Block outputs to stream (e.g., ["agent1.content"])
+
+        Returns:
+            WorkflowExecutionResult object containing the execution result
+
+        Raises:
+            SimStudioError: If the workflow execution fails
+        """
+        return await self.execute_workflow(
+            workflow_id,
+            input,
+            timeout=timeout,
+            stream=stream,
+            selected_outputs=selected_outputs,
+            async_execution=False
+        )
+
+    def set_api_key(self, api_key: str) -> None:
+        """
+        Update the API key.
+
+        Args:
+            api_key: New API key
+        """
+        self.api_key = api_key
+        self._client.headers['X-API-Key'] = api_key
+
+    async def close(self) -> None:
+        """Close the underlying HTTP client."""
+        await self._client.aclose()
+
+    async def get_job_status(self, task_id: str) -> Dict[str, Any]:
+        """
+        Get the status of an async job.
+
+        Args:
+            task_id: The task ID returned from async execution
+
+        Returns:
+            Dictionary containing the job status
+
+        Raises:
+            SimStudioError: If getting the status fails
+        """
+        url = f"{self.base_url}/api/jobs/{task_id}"
+
+        try:
+            response = await self._client.get(url)
+            self._update_rate_limit_info(response)
+            self._raise_for_error(response)
+            return _json_loads(response.content)
+
+        except (httpx.HTTPError, ValueError) as e:
+            raise SimStudioError(f'Failed to get job status: {str(e)}', 'STATUS_ERROR')
+
+    async def execute_with_retry(
+        self,
+        workflow_id: str,
+        input: Optional[Any] = None,
+        *,
+        timeout: float = 30.0,
+        stream: Optional[bool] = None,
+        selected_outputs: Optional[list] = None,
+        async_execution: Optional[bool] = None,
+        max_retries: int = 3,
+        initial_delay: float = 1.0,
+        max_delay: float = 30.0,
+        backoff_multiplier: float = 2.0
+    ) -> Union[WorkflowExecutionResult, AsyncExecutionResult]:
+        """
+        Execute workflow with automatic retry on rate limit.
+
+        Waits between attempts with asyncio.sleep, so other tasks keep running.
+
+        Args:
+            workflow_id: The ID of the workflow to execute
+            input: Input data to pass to the workflow (can include file-like objects)
+            timeout: Timeout in seconds
+            stream: Enable streaming responses
+            selected_outputs: Block outputs to stream
+            async_execution: Execute asynchronously
+            max_retries: Maximum number of retries (default: 3)
+            initial_delay: Initial delay in seconds (default: 1.0)
+            max_delay: Maximum delay in seconds (default: 30.0)
+            backoff_multiplier: Backoff multiplier (default: 2.0)
+
+        Returns:
+            WorkflowExecutionResult or AsyncExecutionResult object
+
+        Raises:
+            SimStudioError: If max retries exceeded or other error occurs
+        """
+        last_error = None
+        schedule = self._backoff_schedule(max_retries, initial_delay, max_delay, backoff_multiplier)
+
+        for attempt in range(max_retries + 1):
+            try:
+                return await self.execute_workflow(
+                    workflow_id,
+                    input,
+                    timeout=timeout,
+                    stream=stream,
+                    selected_outputs=selected_outputs,
+                    async_execution=async_execution
+                )
+            except SimStudioError as e:
+                if e.code != 'RATE_LIMIT_EXCEEDED':
+                    raise
+
+                last_error = e
+
+                # Don't retry after last attempt
+                if attempt == max_retries:
+                    break
+
+                await asyncio.sleep(self._retry_wait(schedule[attempt]))
+
+        raise last_error or SimStudioError('Max retries exceeded', 'MAX_RETRIES_EXCEEDED')
+
+    async def get_usage_limits(self) -> UsageLimits:
+        """
+        Get current usage limits and quota information.
+
+        Returns:
+            UsageLimits object containing usage and quota data
+
+        Raises:
+            SimStudioError: If getting usage limits fails
+        """
+        url = f"{self.base_url}/api/users/me/usage-limits"
+
+        try:
+            response = await self._client.get(url)
+            self._update_rate_limit_info(response)
+            self._raise_for_error(response)
+            data = _json_loads(response.content)
+
+            return UsageLimits(
+                success=data.get('success', True),
+                rate_limit=data.get('rateLimit', {}),
+                usage=data.get('usage', {})
+            )
+
+        except (httpx.HTTPError, ValueError) as e:
+            raise SimStudioError(f'Failed to get usage limits: {str(e)}', 'USAGE_ERROR')
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
+
+
 # For backward compatibility
 Client = SimStudioClient 
\ No newline at end of file
@@ -0,0 +1,19 @@
+"""
+Response factories shared by the Sim Python SDK tests
+"""
+
+import responses
+
+EXECUTE_URL = "https://sim.ai/api/workflows/workflow-id/execute"
+EXECUTE_OK = {"success": True, "output": {}}
+RATE_LIMITED = {"error": "Rate limit exceeded", "code": "RATE_LIMIT_EXCEEDED"}
+RATE_LIMIT_HEADERS = {
+    'x-ratelimit-limit': '100',
+    'x-ratelimit-remaining': '95',
+    'x-ratelimit-reset': '1704067200'
+}
+
+
+def make_response(status=200, json_body=None, headers=None, method=responses.POST, url=EXECUTE_URL):
+    """Build a route for responses.RequestsMock.add; defaults to the execute endpoint."""
+    return responses.Response(method, url, status=status, json=json_body, headers=headers)
@@ -0,0 +1,35 @@
+"""
+Shared fixtures for the Sim Python SDK tests
+"""
+
+import pytest
+
+import simstudio as _sim
+
+
+@pytest.fixture(scope="session")
+def sim():
+    """The simstudio module, imported once per test process."""
+    return _sim
+
+
+@pytest.fixture(scope="session")
+def shared_client(sim):
+    """One client, and so one requests.Session, per test process."""
+    client = sim.SimStudioClient(api_key="test-api-key")
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def client(shared_client):
+    """The shared client, restored to its initial configuration after each test."""
+    api_key = shared_client.api_key
+    base_url = shared_client.base_url
+    use_multipart = shared_client.use_multipart
+    yield shared_client
+    shared_client.set_api_key(api_key)
+    shared_client.set_base_url(base_url)
+    shared_client.use_multipart = use_multipart
+    shared_client._rate_limit_info = None
+    shared_client._last_rl_key = None
@@ -0,0 +1,211 @@
+"""
+Tests for the Sim Python SDK async client
+"""
+
+import asyncio
+import gzip
+import io
+import json
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+
+@pytest.fixture
+def make_client(sim, monkeypatch):
+    """Build AsyncSimStudioClients whose requests are answered by handler."""
+    async_client = httpx.AsyncClient
+
+    def make(handler):
+        transport = httpx.MockTransport(handler)
+        monkeypatch.setattr(
+            sim.httpx, "AsyncClient", lambda **kwargs: async_client(transport=transport, **kwargs)
+        )
+        return sim.AsyncSimStudioClient(api_key="test-api-key")
+    return make
+
+
+def test_async_client_execute_workflow(make_client):
+    """Test execute_workflow sends JSON and parses the result."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"success": True, "output": {"result": "completed"}})
+
+    async def run():
+        async with make_client(handler) as client:
+            return await client.execute_workflow("workflow-id", {"message": "Hello"}, stream=True)
+
+    result = asyncio.run(run())
+
+    assert result.success is True
+    assert result.output == {"result": "completed"}
+    assert str(requests[0].url) == "https://sim.ai/api/workflows/workflow-id/execute"
+    assert json.loads(requests[0].content) == {"message": "Hello", "stream": True}
+    assert requests[0].headers["X-API-Key"] == "test-api-key"
+    assert "X-Execution-Mode" not in requests[0].headers
+
+
+def test_async_client_status_requests_have_no_timeout(make_client):
+    """Test requests without a timeout argument wait as long as the sync client's do."""
+    timeouts = []
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"])
+        return httpx.Response(200, json={"isDeployed": True})
+
+    async def run():
+        async with make_client(handler) as client:
+            await client.get_workflow_status("workflow-id")
+
+    asyncio.run(run())
+
+    assert timeouts == [{"connect": None, "read": None, "write": None, "pool": None}]
+
+
+def test_async_client_async_execution_returns_task_id(sim, make_client):
+    """Test async execution sets the header and returns AsyncExecutionResult."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(202, json={
+            "success": True,
+            "taskId": "task-123",
+            "status": "queued",
+            "createdAt": "2024-01-01T00:00:00Z",
+            "links": {"status": "/api/jobs/task-123"}
+        })
+
+    async def run():
+        async with make_client(handler) as client:
+            return await client.execute_workflow("workflow-id", async_execution=True)
+
+    result = asyncio.run(run())
+
+    assert isinstance(result, sim.AsyncExecutionResult)
+    assert result.task_id == "task-123"
+    assert requests[0].headers["X-Execution-Mode"] == "async"
+
+
+def test_async_client_uploads_files_as_multipart(make_client):
+    """Test file inputs are uploaded as multipart parts."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"success": True, "output": {}})
+
+    file = io.BytesIO(b"file-content")
+    file.name = "notes.txt"
+
+    async def run():
+        async with make_client(handler) as client:
+            client.use_multipart = True
+            await client.execute_workflow("workflow-id", {"document": file})
+
+    asyncio.run(run())
+
+    request = requests[0]
+    assert request.headers["Content-Type"].startswith("multipart/form-data")
+    assert b'name="%5B%22document%22%5D"; filename="notes.txt"' in request.content
+    assert b"file-content" in request.content
+
+
+def test_async_client_content_length_counts_bytes_read(tmp_path, make_client):
+    """Test Content-Length uses the size read() returns, not the on-disk size of a gzip file."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"success": True, "output": {}})
+
+    content = b"sim" * 30000
+    path = tmp_path / "data.gz"
+    with gzip.open(path, "wb") as f:
+        f.write(content)
+
+    async def run():
+        async with make_client(handler) as client:
+            client.use_multipart = True
+            with gzip.open(path, "rb") as file:
+                await client.execute_workflow("workflow-id", {"document": file})
+
+    asyncio.run(run())
+
+    request = requests[0]
+    assert content in request.content
+    assert int(request.headers["Content-Length"]) == len(request.content)
+
+
+def test_async_client_execute_with_retry_retries_on_rate_limit(monkeypatch, make_client):
+    """Test execute_with_retry waits with asyncio.sleep and retries on 429."""
+    responses = [
+        httpx.Response(429, json={"error": "Rate limit exceeded"}, headers={
+            "retry-after": "1",
+            "x-ratelimit-limit": "100",
+            "x-ratelimit-remaining": "0",
+            "x-ratelimit-reset": "1704067200"
+        }),
+        httpx.Response(200, json={"success": True, "output": {}}),
+    ]
+
+    delays = []
+
+    async def record_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr("simstudio.asyncio.sleep", record_sleep)
+
+    async def run():
+        async with make_client(lambda request: responses.pop(0)) as client:
+            return await client.execute_with_retry("workflow-id", {"message": "test"})
+
+    result = asyncio.run(run())
+
+    assert result.success is True
+    assert delays == [1.0]  # retry-after is honoured as is
+    assert responses == []
+
+
+def test_async_client_get_job_status_not_found(sim, make_client):
+    """Test job not found error."""
+    def handler(request):
+        return httpx.Response(404, json={"error": "Job not found", "code": "JOB_NOT_FOUND"})
+
+    async def run():
+        async with make_client(handler) as client:
+            await client.get_job_status("invalid-task")
+
+    with pytest.raises(sim.SimStudioError) as exc_info:
+        asyncio.run(run())
+    assert "Job not found" in str(exc_info.value)
+    assert exc_info.value.code == "JOB_NOT_FOUND"
+
+
+@pytest.mark.parametrize("use_orjson", [True, False], ids=["orjson", "json"])
+@pytest.mark.parametrize("call, code", [
+    pytest.param(lambda c: c.execute_workflow("workflow-id"), "EXECUTION_ERROR", id="execute_workflow"),
+    pytest.param(lambda c: c.get_workflow_status("workflow-id"), "STATUS_ERROR", id="get_workflow_status"),
+    pytest.param(lambda c: c.get_job_status("task-123"), "STATUS_ERROR", id="get_job_status"),
+    pytest.param(lambda c: c.get_usage_limits(), "USAGE_ERROR", id="get_usage_limits"),
+])
+def test_async_client_non_json_success_body_raises_simstudio_error(
+    sim, monkeypatch, make_client, use_orjson, call, code
+):
+    """Test a 2xx body that is not JSON (e.g. a proxy's HTML page) raises SimStudioError."""
+    if not use_orjson:
+        monkeypatch.setattr("simstudio.orjson", None)
+
+    def handler(request):
+        return httpx.Response(200, text="<html>Bad gateway</html>")
+
+    async def run():
+        async with make_client(handler) as client:
+            await call(client)
+
+    with pytest.raises(sim.SimStudioError) as exc_info:
+        asyncio.run(run())
+    assert exc_info.value.code == code
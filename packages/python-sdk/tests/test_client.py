@@ -2,69 +2,94 @@
 Tests for the Sim Python SDK
 """
 
+import base64
+import gzip
+import io
+import json
+
 import pytest
-from unittest.mock import Mock, patch
-from simstudio import SimStudioClient, SimStudioError, WorkflowExecutionResult, WorkflowStatus
+import requests
+import responses
+from tests._factories import EXECUTE_OK, RATE_LIMIT_HEADERS, RATE_LIMITED, make_response
+
+
+@pytest.fixture(autouse=True)
+def mocked_responses():
+    """Route every request made through requests to routes registered by the test."""
+    with responses.RequestsMock() as rsps:
+        yield rsps
+
+
+@pytest.fixture(autouse=True)
+def sleeps(monkeypatch):
+    """Record retry delays instead of sleeping through them."""
+    delays = []
+    monkeypatch.setattr("simstudio.time.sleep", delays.append)
+    return delays
 
 
-def test_simstudio_client_initialization():
+def sent_json(mocked_responses, index=-1):
+    """Decode the JSON body of a request the client sent."""
+    return json.loads(mocked_responses.calls[index].request.body)
+
+
+def test_simstudio_client_initialization(sim):
     """Test SimStudioClient initialization."""
-    client = SimStudioClient(api_key="test-api-key", base_url="https://test.sim.ai")
+    client = sim.SimStudioClient(api_key="test-api-key", base_url="https://test.sim.ai")
     assert client.api_key == "test-api-key"
     assert client.base_url == "https://test.sim.ai"
 
 
-def test_simstudio_client_default_base_url():
+def test_simstudio_client_default_base_url(sim):
     """Test SimStudioClient with default base URL."""
-    client = SimStudioClient(api_key="test-api-key")
+    client = sim.SimStudioClient(api_key="test-api-key")
     assert client.api_key == "test-api-key"
     assert client.base_url == "https://sim.ai"
 
 
-def test_set_api_key():
+def test_set_api_key(client):
     """Test setting a new API key."""
-    client = SimStudioClient(api_key="test-api-key")
     client.set_api_key("new-api-key")
     assert client.api_key == "new-api-key"
 
 
-def test_set_base_url():
+def test_set_base_url(client):
     """Test setting a new base URL."""
-    client = SimStudioClient(api_key="test-api-key")
     client.set_base_url("https://new.sim.ai/")
     assert client.base_url == "https://new.sim.ai"
 
 
-def test_set_base_url_strips_trailing_slash():
+def test_set_base_url_strips_trailing_slash(client):
     """Test that base URL strips trailing slash."""
-    client = SimStudioClient(api_key="test-api-key")
     client.set_base_url("https://test.sim.ai/")
     assert client.base_url == "https://test.sim.ai"
 
 
-@patch('simstudio.requests.Session.get')
-def test_validate_workflow_returns_false_on_error(mock_get):
+def test_validate_workflow_returns_false_on_error(mocked_responses, client):
     """Test that validate_workflow returns False when request fails."""
-    mock_get.side_effect = SimStudioError("Network error")
-    
-    client = SimStudioClient(api_key="test-api-key")
+    mocked_responses.add(
+        responses.GET,
+        "https://sim.ai/api/workflows/test-workflow-id/status",
+        body=requests.ConnectionError("Network error")
+    )
+
     result = client.validate_workflow("test-workflow-id")
-    
+
     assert result is False
-    mock_get.assert_called_once_with("https://sim.ai/api/workflows/test-workflow-id/status")
+    assert len(mocked_responses.calls) == 1
 
 
-def test_simstudio_error():
+def test_simstudio_error(sim):
     """Test SimStudioError creation."""
-    error = SimStudioError("Test error", "TEST_CODE", 400)
+    error = sim.SimStudioError("Test error", "TEST_CODE", 400)
     assert str(error) == "Test error"
     assert error.code == "TEST_CODE"
     assert error.status == 400
 
 
-def test_workflow_execution_result():
+def test_workflow_execution_result(sim):
     """Test WorkflowExecutionResult data class."""
-    result = WorkflowExecutionResult(
+    result = sim.WorkflowExecutionResult(
         success=True,
         output={"data": "test"},
         metadata={"duration": 1000}
@@ -74,9 +99,9 @@ def test_workflow_execution_result():
     assert result.metadata == {"duration": 1000}
 
 
-def test_workflow_status():
+def test_workflow_status(sim):
     """Test WorkflowStatus data class."""
-    status = WorkflowStatus(
+    status = sim.WorkflowStatus(
         is_deployed=True,
         deployed_at="2023-01-01T00:00:00Z",
         needs_redeployment=False
@@ -86,31 +111,29 @@ def test_workflow_status():
     assert status.needs_redeployment is False
 
 
-@patch('simstudio.requests.Session.close')
-def test_context_manager(mock_close):
+def test_context_manager(monkeypatch, sim):
     """Test SimStudioClient as context manager."""
-    with SimStudioClient(api_key="test-api-key") as client:
+    closed = []
+
+    def record_close(session):
+        closed.append(session)
+
+    monkeypatch.setattr("simstudio.requests.Session.close", record_close)
+    with sim.SimStudioClient(api_key="test-api-key") as client:
         assert client.api_key == "test-api-key"
-    mock_close.assert_called_once()
+    assert closed == [client._session]
 
 
-@patch('simstudio.requests.Session.post')
-def test_async_execution_returns_task_id(mock_post):
+def test_async_execution_returns_task_id(mocked_responses, client):
     """Test async execution returns AsyncExecutionResult."""
-    mock_response = Mock()
-    mock_response.ok = True
-    mock_response.status_code = 202
-    mock_response.json.return_value = {
+    mocked_responses.add(make_response(202, {
         "success": True,
         "taskId": "task-123",
         "status": "queued",
         "createdAt": "2024-01-01T00:00:00Z",
         "links": {"status": "/api/jobs/task-123"}
-    }
-    mock_response.headers.get.return_value = None
-    mock_post.return_value = mock_response
+    }))
 
-    client = SimStudioClient(api_key="test-api-key")
     result = client.execute_workflow(
         "workflow-id",
         {"message": "Hello"},
@@ -122,25 +145,17 @@ def test_async_execution_returns_task_id(mock_post):
     assert result.status == "queued"
     assert result.links["status"] == "/api/jobs/task-123"
 
-    call_args = mock_post.call_args
-    assert call_args[1]["headers"]["X-Execution-Mode"] == "async"
+    assert mocked_responses.calls[-1].request.headers["X-Execution-Mode"] == "async"
 
 
-@patch('simstudio.requests.Session.post')
-def test_sync_execution_returns_result(mock_post):
+def test_sync_execution_returns_result(mocked_responses, client):
     """Test sync execution returns WorkflowExecutionResult."""
-    mock_response = Mock()
-    mock_response.ok = True
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mocked_responses.add(make_response(200, {
         "success": True,
         "output": {"result": "completed"},
         "logs": []
-    }
-    mock_response.headers.get.return_value = None
-    mock_post.return_value = mock_response
+    }))
 
-    client = SimStudioClient(api_key="test-api-key")
     result = client.execute_workflow(
         "workflow-id",
         {"message": "Hello"},
@@ -152,29 +167,18 @@ def test_sync_execution_returns_result(mock_post):
     assert not hasattr(result, 'task_id')
 
 
-@patch('simstudio.requests.Session.post')
-def test_async_header_not_set_when_false(mock_post):
+def test_async_header_not_set_when_false(mocked_responses, client):
     """Test X-Execution-Mode header is not set when async_execution is None."""
-    mock_response = Mock()
-    mock_response.ok = True
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"success": True, "output": {}}
-    mock_response.headers.get.return_value = None
-    mock_post.return_value = mock_response
-
-    client = SimStudioClient(api_key="test-api-key")
+    mocked_responses.add(make_response(200, EXECUTE_OK))
+
     client.execute_workflow("workflow-id", {"message": "Hello"})
 
-    call_args = mock_post.call_args
-    assert "X-Execution-Mode" not in call_args[1]["headers"]
+    assert "X-Execution-Mode" not in mocked_responses.calls[-1].request.headers
 
 
-@patch('simstudio.requests.Session.get')
-def test_get_job_status_success(mock_get):
+def test_get_job_status_success(mocked_responses, client):
     """Test getting job status."""
-    mock_response = Mock()
-    mock_response.ok = True
-    mock_response.json.return_value = {
+    mocked_responses.add(make_response(200, {
         "success": True,
         "taskId": "task-123",
         "status": "completed",
@@ -184,178 +188,94 @@ def test_get_job_status_success(mock_get):
             "duration": 60000
         },
         "output": {"result": "done"}
-    }
-    mock_response.headers.get.return_value = None
-    mock_get.return_value = mock_response
+    }, method=responses.GET, url="https://test.sim.ai/api/jobs/task-123"))
 
-    client = SimStudioClient(api_key="test-api-key", base_url="https://test.sim.ai")
+    client.set_base_url("https://test.sim.ai")
     result = client.get_job_status("task-123")
 
     assert result["taskId"] == "task-123"
     assert result["status"] == "completed"
     assert result["output"]["result"] == "done"
-    mock_get.assert_called_once_with("https://test.sim.ai/api/jobs/task-123")
+    assert len(mocked_responses.calls) == 1
 
 
-@patch('simstudio.requests.Session.get')
-def test_get_job_status_not_found(mock_get):
+def test_get_job_status_not_found(sim, mocked_responses, client):
     """Test job not found error."""
-    mock_response = Mock()
-    mock_response.ok = False
-    mock_response.status_code = 404
-    mock_response.reason = "Not Found"
-    mock_response.json.return_value = {
+    mocked_responses.add(make_response(404, {
         "error": "Job not found",
         "code": "JOB_NOT_FOUND"
-    }
-    mock_response.headers.get.return_value = None
-    mock_get.return_value = mock_response
-
-    client = SimStudioClient(api_key="test-api-key")
+    }, method=responses.GET, url="https://sim.ai/api/jobs/invalid-task"))
 
-    with pytest.raises(SimStudioError) as exc_info:
+    with pytest.raises(sim.SimStudioError) as exc_info:
         client.get_job_status("invalid-task")
     assert "Job not found" in str(exc_info.value)
 
 
-@patch('simstudio.requests.Session.post')
-@patch('simstudio.time.sleep')
-def test_execute_with_retry_success_first_attempt(mock_sleep, mock_post):
-    """Test retry succeeds on first attempt."""
-    mock_response = Mock()
-    mock_response.ok = True
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
-        "success": True,
-        "output": {"result": "success"}
-    }
-    mock_response.headers.get.return_value = None
-    mock_post.return_value = mock_response
-
-    client = SimStudioClient(api_key="test-api-key")
-    result = client.execute_with_retry("workflow-id", {"message": "test"})
+RETRY_SUCCESS = (200, {"success": True, "output": {"result": "success"}}, None)
+RETRY_RATE_LIMITED = (429, RATE_LIMITED, {
+    **RATE_LIMIT_HEADERS,
+    'retry-after': '1',
+    'x-ratelimit-remaining': '0',
+})
+RETRY_SERVER_ERROR = (500, {"error": "Server error", "code": "INTERNAL_ERROR"}, None)
+
+
+@pytest.mark.parametrize("sequence, max_retries, calls, error", [
+    pytest.param([RETRY_SUCCESS], 3, 1, None, id="success-first-attempt"),
+    pytest.param([RETRY_RATE_LIMITED, RETRY_SUCCESS], 3, 2, None, id="retries-on-rate-limit"),
+    # The last registered response keeps answering, so this is rate limited every time
+    pytest.param([RETRY_RATE_LIMITED], 2, 3, "Rate limit exceeded", id="max-retries-exceeded"),
+    pytest.param([RETRY_SERVER_ERROR], 3, 1, "Server error", id="no-retry-on-other-errors"),
+])
+def test_execute_with_retry(sim, mocked_responses, client, sleeps, sequence, max_retries, calls, error):
+    """Test execute_with_retry retries only rate limited requests, up to max_retries."""
+    for status, body, headers in sequence:
+        mocked_responses.add(make_response(status, body, headers))
+
+    if error is None:
+        result = client.execute_with_retry(
+            "workflow-id", {"message": "test"}, max_retries=max_retries, initial_delay=0.01
+        )
+        assert result.success is True
+    else:
+        with pytest.raises(sim.SimStudioError, match=error):
+            client.execute_with_retry(
+                "workflow-id", {"message": "test"}, max_retries=max_retries, initial_delay=0.01
+            )
 
-    assert result.success is True
-    assert mock_post.call_count == 1
-    assert mock_sleep.call_count == 0
-
-
-@patch('simstudio.requests.Session.post')
-@patch('simstudio.time.sleep')
-def test_execute_with_retry_retries_on_rate_limit(mock_sleep, mock_post):
-    """Test retry retries on rate limit error."""
-    rate_limit_response = Mock()
-    rate_limit_response.ok = False
-    rate_limit_response.status_code = 429
-    rate_limit_response.json.return_value = {
-        "error": "Rate limit exceeded",
-        "code": "RATE_LIMIT_EXCEEDED"
-    }
-    import time
-    rate_limit_response.headers.get.side_effect = lambda h: {
-        'retry-after': '1',
-        'x-ratelimit-limit': '100',
-        'x-ratelimit-remaining': '0',
-        'x-ratelimit-reset': str(int(time.time()) + 60)
-    }.get(h)
-
-    success_response = Mock()
-    success_response.ok = True
-    success_response.status_code = 200
-    success_response.json.return_value = {
-        "success": True,
-        "output": {"result": "success"}
-    }
-    success_response.headers.get.return_value = None
+    assert len(mocked_responses.calls) == calls
+    assert len(sleeps) == calls - 1  # One wait before each retry
 
-    mock_post.side_effect = [rate_limit_response, success_response]
 
-    client = SimStudioClient(api_key="test-api-key")
-    result = client.execute_with_retry(
-        "workflow-id",
-        {"message": "test"},
-        max_retries=3,
-        initial_delay=0.01
-    )
+def test_execute_with_retry_backoff_is_capped(sim, mocked_responses, client, sleeps):
+    """Test retry delays grow exponentially up to max_delay, with jitter."""
+    mocked_responses.add(make_response(429, RATE_LIMITED))
 
-    assert result.success is True
-    assert mock_post.call_count == 2
-    assert mock_sleep.call_count == 1
-
-
-@patch('simstudio.requests.Session.post')
-@patch('simstudio.time.sleep')
-def test_execute_with_retry_max_retries_exceeded(mock_sleep, mock_post):
-    """Test retry throws after max retries."""
-    mock_response = Mock()
-    mock_response.ok = False
-    mock_response.status_code = 429
-    mock_response.json.return_value = {
-        "error": "Rate limit exceeded",
-        "code": "RATE_LIMIT_EXCEEDED"
-    }
-    mock_response.headers.get.side_effect = lambda h: '1' if h == 'retry-after' else None
-    mock_post.return_value = mock_response
-
-    client = SimStudioClient(api_key="test-api-key")
-
-    with pytest.raises(SimStudioError) as exc_info:
+    with pytest.raises(sim.SimStudioError):
         client.execute_with_retry(
             "workflow-id",
             {"message": "test"},
-            max_retries=2,
-            initial_delay=0.01
+            max_retries=4,
+            initial_delay=1.0,
+            max_delay=3.0,
+            backoff_multiplier=2.0
         )
 
-    assert "Rate limit exceeded" in str(exc_info.value)
-    assert mock_post.call_count == 3  # Initial + 2 retries
-
-
-@patch('simstudio.requests.Session.post')
-def test_execute_with_retry_no_retry_on_other_errors(mock_post):
-    """Test retry does not retry on non-rate-limit errors."""
-    mock_response = Mock()
-    mock_response.ok = False
-    mock_response.status_code = 500
-    mock_response.reason = "Internal Server Error"
-    mock_response.json.return_value = {
-        "error": "Server error",
-        "code": "INTERNAL_ERROR"
-    }
-    mock_response.headers.get.return_value = None
-    mock_post.return_value = mock_response
-
-    client = SimStudioClient(api_key="test-api-key")
-
-    with pytest.raises(SimStudioError) as exc_info:
-        client.execute_with_retry("workflow-id", {"message": "test"})
-
-    assert "Server error" in str(exc_info.value)
-    assert mock_post.call_count == 1  # No retries
+    for wait, base in zip(sleeps, [1.0, 2.0, 3.0, 3.0]):
+        assert base * 0.75 <= wait <= base * 1.25
+    assert len(sleeps) == 4
 
 
-def test_get_rate_limit_info_returns_none_initially():
+def test_get_rate_limit_info_returns_none_initially(client):
     """Test rate limit info is None before any API calls."""
-    client = SimStudioClient(api_key="test-api-key")
     info = client.get_rate_limit_info()
     assert info is None
 
 
-@patch('simstudio.requests.Session.post')
-def test_get_rate_limit_info_after_api_call(mock_post):
+def test_get_rate_limit_info_after_api_call(mocked_responses, client):
     """Test rate limit info is populated after API call."""
-    mock_response = Mock()
-    mock_response.ok = True
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"success": True, "output": {}}
-    mock_response.headers.get.side_effect = lambda h: {
-        'x-ratelimit-limit': '100',
-        'x-ratelimit-remaining': '95',
-        'x-ratelimit-reset': '1704067200'
-    }.get(h)
-    mock_post.return_value = mock_response
-
-    client = SimStudioClient(api_key="test-api-key")
+    mocked_responses.add(make_response(200, EXECUTE_OK, RATE_LIMIT_HEADERS))
+
     client.execute_workflow("workflow-id", {})
 
     info = client.get_rate_limit_info()
@@ -365,12 +285,25 @@ def test_get_rate_limit_info_after_api_call(mock_post):
     assert info.reset == 1704067200
 
 
-@patch('simstudio.requests.Session.get')
-def test_get_usage_limits_success(mock_get):
+def test_rate_limit_info_only_rebuilt_when_headers_change(mocked_responses, client):
+    """Test identical rate limit headers reuse the existing info."""
+    mocked_responses.add(make_response(200, EXECUTE_OK, RATE_LIMIT_HEADERS))
+    mocked_responses.add(make_response(200, EXECUTE_OK, RATE_LIMIT_HEADERS))
+    mocked_responses.add(make_response(200, EXECUTE_OK, {**RATE_LIMIT_HEADERS, 'x-ratelimit-remaining': '94'}))
+
+    client.execute_workflow("workflow-id", {})
+    first = client.get_rate_limit_info()
+    client.execute_workflow("workflow-id", {})
+    assert client.get_rate_limit_info() is first
+
+    client.execute_workflow("workflow-id", {})
+    assert client.get_rate_limit_info() is not first
+    assert client.get_rate_limit_info().remaining == 94
+
+
+def test_get_usage_limits_success(mocked_responses, client):
     """Test getting usage limits."""
-    mock_response = Mock()
-    mock_response.ok = True
-    mock_response.json.return_value = {
+    mocked_responses.add(make_response(200, {
         "success": True,
         "rateLimit": {
             "sync": {
@@ -392,11 +325,9 @@ def test_get_usage_limits_success(mock_get):
             "limit": 100.0,
             "plan": "pro"
         }
-    }
-    mock_response.headers.get.return_value = None
-    mock_get.return_value = mock_response
+    }, method=responses.GET, url="https://test.sim.ai/api/users/me/usage-limits"))
 
-    client = SimStudioClient(api_key="test-api-key", base_url="https://test.sim.ai")
+    client.set_base_url("https://test.sim.ai")
     result = client.get_usage_limits()
 
     assert result.success is True
@@ -404,132 +335,243 @@ def test_get_usage_limits_success(mock_get):
     assert result.rate_limit["async"]["limit"] == 50
     assert result.usage["currentPeriodCost"] == 1.23
     assert result.usage["plan"] == "pro"
-    mock_get.assert_called_once_with("https://test.sim.ai/api/users/me/usage-limits")
+    assert len(mocked_responses.calls) == 1
 
 
-@patch('simstudio.requests.Session.get')
-def test_get_usage_limits_unauthorized(mock_get):
+def test_get_usage_limits_unauthorized(sim, mocked_responses, client):
     """Test usage limits with invalid API key."""
-    mock_response = Mock()
-    mock_response.ok = False
-    mock_response.status_code = 401
-    mock_response.reason = "Unauthorized"
-    mock_response.json.return_value = {
+    mocked_responses.add(make_response(401, {
         "error": "Invalid API key",
         "code": "UNAUTHORIZED"
-    }
-    mock_response.headers.get.return_value = None
-    mock_get.return_value = mock_response
+    }, method=responses.GET, url="https://sim.ai/api/users/me/usage-limits"))
 
-    client = SimStudioClient(api_key="invalid-key")
+    client.set_api_key("invalid-key")
 
-    with pytest.raises(SimStudioError) as exc_info:
+    with pytest.raises(sim.SimStudioError) as exc_info:
         client.get_usage_limits()
     assert "Invalid API key" in str(exc_info.value)
+    assert mocked_responses.calls[-1].request.headers["X-API-Key"] == "invalid-key"
 
 
-@patch('simstudio.requests.Session.post')
-def test_execute_workflow_with_stream_and_selected_outputs(mock_post):
+def test_execute_workflow_with_stream_and_selected_outputs(mocked_responses, client):
     """Test execution with stream and selectedOutputs parameters."""
-    mock_response = Mock()
-    mock_response.ok = True
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"success": True, "output": {}}
-    mock_response.headers.get.return_value = None
-    mock_post.return_value = mock_response
-
-    client = SimStudioClient(api_key="test-api-key")
+    mocked_responses.add(make_response(200, EXECUTE_OK))
+
+    selected = ["agent1.content", "agent2.content"]
+
+    body, _ = client._build_execute_body({"message": "test"}, True, selected)
+    assert body["selectedOutputs"] is selected  # Passed through, not copied
+
     client.execute_workflow(
         "workflow-id",
         {"message": "test"},
         stream=True,
-        selected_outputs=["agent1.content", "agent2.content"]
+        selected_outputs=selected
     )
 
-    call_args = mock_post.call_args
-    request_body = call_args[1]["json"]
+    request_body = sent_json(mocked_responses)
 
     assert request_body["message"] == "test"
     assert request_body["stream"] is True
-    assert request_body["selectedOutputs"] == ["agent1.content", "agent2.content"]
+    assert request_body["selectedOutputs"] == selected
 
 
 # Tests for primitive and list inputs
-@patch('simstudio.requests.Session.post')
-def test_execute_workflow_with_string_input(mock_post):
+def test_execute_workflow_with_string_input(mocked_responses, client):
     """Test execution with primitive string input wraps in input field."""
-    mock_response = Mock()
-    mock_response.ok = True
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"success": True, "output": {}}
-    mock_response.headers.get.return_value = None
-    mock_post.return_value = mock_response
-
-    client = SimStudioClient(api_key="test-api-key")
+    mocked_responses.add(make_response(200, EXECUTE_OK))
+
     client.execute_workflow("workflow-id", "NVDA")
 
-    call_args = mock_post.call_args
-    request_body = call_args[1]["json"]
+    request_body = sent_json(mocked_responses)
 
     assert request_body["input"] == "NVDA"
     assert "0" not in request_body  # Should not spread string characters
 
 
-@patch('simstudio.requests.Session.post')
-def test_execute_workflow_with_number_input(mock_post):
+def test_execute_workflow_with_number_input(mocked_responses, client):
     """Test execution with primitive number input wraps in input field."""
-    mock_response = Mock()
-    mock_response.ok = True
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"success": True, "output": {}}
-    mock_response.headers.get.return_value = None
-    mock_post.return_value = mock_response
-
-    client = SimStudioClient(api_key="test-api-key")
+    mocked_responses.add(make_response(200, EXECUTE_OK))
+
     client.execute_workflow("workflow-id", 42)
 
-    call_args = mock_post.call_args
-    request_body = call_args[1]["json"]
+    request_body = sent_json(mocked_responses)
 
     assert request_body["input"] == 42
 
 
-@patch('simstudio.requests.Session.post')
-def test_execute_workflow_with_list_input(mock_post):
+def test_execute_workflow_with_list_input(mocked_responses, client):
     """Test execution with list input wraps in input field."""
-    mock_response = Mock()
-    mock_response.ok = True
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"success": True, "output": {}}
-    mock_response.headers.get.return_value = None
-    mock_post.return_value = mock_response
+    mocked_responses.add(make_response(200, EXECUTE_OK))
 
-    client = SimStudioClient(api_key="test-api-key")
-    client.execute_workflow("workflow-id", ["NVDA", "AAPL", "GOOG"])
+    tickers = ["NVDA", "AAPL", "GOOG"]
 
-    call_args = mock_post.call_args
-    request_body = call_args[1]["json"]
+    body, _ = client._build_execute_body(tickers, None, None)
+    assert body["input"] is tickers
 
-    assert request_body["input"] == ["NVDA", "AAPL", "GOOG"]
+    client.execute_workflow("workflow-id", tickers)
+
+    request_body = sent_json(mocked_responses)
+
+    assert request_body["input"] == tickers
     assert "0" not in request_body  # Should not spread list
 
 
-@patch('simstudio.requests.Session.post')
-def test_execute_workflow_with_dict_input_spreads_at_root(mock_post):
+def test_execute_workflow_with_dict_input_spreads_at_root(mocked_responses, client):
     """Test execution with dict input spreads at root level."""
-    mock_response = Mock()
-    mock_response.ok = True
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"success": True, "output": {}}
-    mock_response.headers.get.return_value = None
-    mock_post.return_value = mock_response
-
-    client = SimStudioClient(api_key="test-api-key")
+    mocked_responses.add(make_response(200, EXECUTE_OK))
+
     client.execute_workflow("workflow-id", {"ticker": "NVDA", "quantity": 100})
 
-    call_args = mock_post.call_args
-    request_body = call_args[1]["json"]
+    request_body = sent_json(mocked_responses)
 
     assert request_body["ticker"] == "NVDA"
     assert request_body["quantity"] == 100
-    assert "input" not in request_body  # Should not wrap in input field 
\ No newline at end of file
+    assert "input" not in request_body  # Should not wrap in input field
+
+
+# Tests for file uploads
+def test_execute_workflow_with_file_uses_multipart(mocked_responses, client):
+    """Test file inputs are sent as multipart parts named by their input path."""
+    mocked_responses.add(make_response(200, EXECUTE_OK))
+
+    file = io.BytesIO(b"%PDF-1.4")
+    file.name = "/tmp/report.pdf"
+
+    client.use_multipart = True
+    client.execute_workflow("workflow-id", {"message": "Hello", "docs": [file]})
+
+    request = mocked_responses.calls[-1].request
+    body = request.body
+    content_type = request.headers["Content-Type"]
+    assert content_type == body.content_type
+    boundary = content_type.split("boundary=")[1]
+
+    encoded = b"".join(body)
+    assert int(request.headers["Content-Length"]) == len(encoded)
+    assert encoded == (
+        f'--{boundary}\r\n'
+        'Content-Disposition: form-data; name="message"\r\n\r\n"Hello"\r\n'
+        f'--{boundary}\r\n'
+        'Content-Disposition: form-data; name="docs"\r\n\r\n[null]\r\n'
+        f'--{boundary}\r\n'
+        'Content-Disposition: form-data; name="%5B%22docs%22%2C%200%5D"; filename="report.pdf"\r\n'
+        'Content-Type: application/octet-stream\r\n\r\n%PDF-1.4\r\n'
+        f'--{boundary}--\r\n'
+    ).encode()
+    # The file is streamed from, and left at, its original position
+    assert file.tell() == 0
+
+
+def test_execute_workflow_content_length_counts_bytes_read(tmp_path, mocked_responses, client):
+    """Test Content-Length uses the size read() returns, not the on-disk size of a gzip file."""
+    mocked_responses.add(make_response(200, EXECUTE_OK))
+
+    content = b"sim" * 30000
+    path = tmp_path / "data.gz"
+    with gzip.open(path, "wb") as f:
+        f.write(content)
+
+    client.use_multipart = True
+    with gzip.open(path, "rb") as file:
+        client.execute_workflow("workflow-id", {"document": file})
+        request = mocked_responses.calls[-1].request
+        encoded = b"".join(request.body)
+
+    assert content in encoded
+    assert int(request.headers["Content-Length"]) == len(encoded)
+
+
+def test_execute_workflow_with_file_base64_by_default(mocked_responses, client):
+    """Test file inputs are base64-encoded into the JSON body unless multipart is enabled."""
+    mocked_responses.add(make_response(200, EXECUTE_OK))
+
+    file = io.BytesIO(b"hello")
+    file.name = "notes.txt"
+
+    assert client.use_multipart is False
+    client.execute_workflow("workflow-id", {"document": file})
+
+    request_body = sent_json(mocked_responses)
+    assert request_body["document"] == {
+        "type": "file",
+        "data": "data:application/octet-stream;base64,aGVsbG8=",
+        "name": "notes.txt",
+        "mime": "application/octet-stream"
+    }
+
+
+def test_execute_workflow_base64_handles_short_reads(mocked_responses, client):
+    """Test chunked base64 encoding stays correct when read() returns fewer bytes."""
+    mocked_responses.add(make_response(200, EXECUTE_OK))
+
+    class ShortReader(io.BytesIO):
+        def read(self, size=-1):
+            return super().read(min(size, 4) if size and size > 0 else size)
+
+    content = bytes(range(256)) * 3
+    file = ShortReader(content)
+    file.name = "data.bin"
+
+    client.execute_workflow("workflow-id", {"document": file})
+
+    request_body = sent_json(mocked_responses)
+    expected = base64.b64encode(content).decode("ascii")
+    assert request_body["document"]["data"] == f"data:application/octet-stream;base64,{expected}"
+    assert file.tell() == 0
+
+
+@pytest.mark.parametrize("use_orjson", [True, False], ids=["orjson", "json"])
+def test_execute_workflow_json_round_trip(monkeypatch, mocked_responses, client, use_orjson):
+    """Test request and response bodies are JSON with or without orjson installed."""
+    if not use_orjson:
+        monkeypatch.setattr("simstudio.orjson", None)
+    mocked_responses.add(make_response(200, {"success": True, "output": {"reply": "h\u00e9llo"}}))
+
+    result = client.execute_workflow("workflow-id", {"message": "h\u00e9llo", "count": 2})
+
+    assert sent_json(mocked_responses) == {"message": "h\u00e9llo", "count": 2}
+    assert mocked_responses.calls[-1].request.headers["Content-Type"] == "application/json"
+    assert result.output == {"reply": "h\u00e9llo"}
+
+
+NON_JSON_CALLS = [
+    pytest.param(responses.POST, "workflows/workflow-id/execute",
+                 lambda c: c.execute_workflow("workflow-id"), "EXECUTION_ERROR", id="execute_workflow"),
+    pytest.param(responses.GET, "workflows/workflow-id/status",
+                 lambda c: c.get_workflow_status("workflow-id"), "STATUS_ERROR", id="get_workflow_status"),
+    pytest.param(responses.GET, "jobs/task-123",
+                 lambda c: c.get_job_status("task-123"), "STATUS_ERROR", id="get_job_status"),
+    pytest.param(responses.GET, "users/me/usage-limits",
+                 lambda c: c.get_usage_limits(), "USAGE_ERROR", id="get_usage_limits"),
+]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False], ids=["orjson", "json"])
+@pytest.mark.parametrize("method, path, call, code", NON_JSON_CALLS)
+def test_non_json_success_body_raises_simstudio_error(
+    sim, monkeypatch, mocked_responses, client, use_orjson, method, path, call, code
+):
+    """Test a 2xx body that is not JSON (e.g. a proxy's HTML page) raises SimStudioError."""
+    if not use_orjson:
+        monkeypatch.setattr("simstudio.orjson", None)
+    mocked_responses.add(method, f"https://sim.ai/api/{path}", body="<html>Bad gateway</html>")
+
+    with pytest.raises(sim.SimStudioError) as exc_info:
+        call(client)
+    assert exc_info.value.code == code
+
+
+def test_execute_workflow_does_not_copy_or_mutate_input(mocked_responses, client):
+    """Test dict input without files is sent as-is and never mutated."""
+    mocked_responses.add(make_response(200, EXECUTE_OK))
+
+    payload = {"message": "Hello"}
+
+    body, files = client._build_execute_body(payload, None, None)
+    assert body is payload
+    assert files == []
+
+    client.execute_workflow("workflow-id", payload, stream=True)
+    assert sent_json(mocked_responses) == {"message": "Hello", "stream": True}
+    assert payload == {"message": "Hello"}